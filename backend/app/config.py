@@ -3,123 +3,145 @@ Configuration module for LLM Evaluation Tool backend
 Uses Pydantic settings for environment variable management
 """
 
-from pydantic_settings import BaseSettings
-from pydantic import Field, validator
-from typing import List, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import AfterValidator, BeforeValidator
+from functools import cached_property, lru_cache
+from typing import Annotated, Optional, Tuple, Union
 import os
+import re
+
+
+def _csv_to_tuple(value):
+    """Parse a comma-separated string into a tuple of stripped items"""
+    if isinstance(value, str):
+        return tuple(item.strip() for item in value.split(",") if item.strip())
+    return value
+
+
+def _lowercase_all(values: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Lowercase every item of a parsed list"""
+    return tuple(value.lower() for value in values)
+
+
+# Comma-separated list setting. The str member of the union lets pydantic-settings
+# fall back to the raw env value when it is not JSON, so the validator can split it.
+CommaSeparated = Annotated[Union[str, Tuple[str, ...]], BeforeValidator(_csv_to_tuple)]
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
     
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
+    
     # Multi-Provider Configuration
-    openai_api_key: Optional[str] = Field(None, env="OPENAI_API_KEY")
-    anthropic_api_key: Optional[str] = Field(None, env="ANTHROPIC_API_KEY")
-    google_api_key: Optional[str] = Field(None, env="GOOGLE_API_KEY")
-    groq_api_key: Optional[str] = Field(None, env="GROQ_API_KEY")
+    openai_api_key: Optional[str] = None
+    anthropic_api_key: Optional[str] = None
+    google_api_key: Optional[str] = None
+    groq_api_key: Optional[str] = None
     
     # Custom Provider Configuration
-    custom_provider_url: Optional[str] = Field(None, env="CUSTOM_PROVIDER_URL")
-    custom_provider_api_key: Optional[str] = Field(None, env="CUSTOM_PROVIDER_API_KEY")
+    custom_provider_url: Optional[str] = None
+    custom_provider_api_key: Optional[str] = None
     
     # Application Settings
-    environment: str = Field("development", env="ENVIRONMENT")
-    debug: bool = Field(True, env="DEBUG")
+    environment: str = "development"
+    debug: bool = True
     
     # Security Settings
-    secret_key: str = Field("dev-secret-key-change-in-production", env="SECRET_KEY")
-    max_file_size_mb: int = Field(5, env="MAX_FILE_SIZE_MB")
-    allowed_file_types: str = Field(".csv,.jsonl", env="ALLOWED_FILE_TYPES")
+    secret_key: str = "dev-secret-key-change-in-production"
+    max_file_size_mb: int = 5
+    allowed_file_types: CommaSeparated = ".csv,.jsonl"
     
     # CORS Settings
-    allowed_origins: str = Field(
-        "http://localhost:3000,http://127.0.0.1:3000", 
-        env="ALLOWED_ORIGINS"
-    )
+    allowed_origins: CommaSeparated = "http://localhost:3000,http://127.0.0.1:3000"
     
     # Trusted hosts for production
-    allowed_hosts: str = Field("localhost,127.0.0.1", env="ALLOWED_HOSTS")
+    allowed_hosts: CommaSeparated = "localhost,127.0.0.1"
     
     # Rate Limiting
-    rate_limit_per_minute: int = Field(60, env="RATE_LIMIT_PER_MINUTE")
-    evaluation_rate_limit_per_minute: int = Field(10, env="EVALUATION_RATE_LIMIT_PER_MINUTE")
+    rate_limit_per_minute: int = 60
+    evaluation_rate_limit_per_minute: int = 10
+    
+    # Outgoing LLM API calls
+    max_concurrent_llm_calls: int = 20
+    llm_requests_per_minute: int = 0  # 0 disables the client-side rate limit
+    
+    # Evaluation Storage (in-memory unless a Redis URL is configured)
+    redis_url: Optional[str] = None
+    evaluation_ttl_seconds: int = 86400
+    max_stored_evaluations: int = 256  # In-memory only, least recently used are evicted
+    
+    # Exact-match result cache (only used for temperature 0 calls)
+    result_cache_ttl_seconds: int = 7 * 86400
+    
+    # Exact-match LLM response cache (caches every call, including sampled
+    # ones, so identical re-runs reuse earlier responses)
+    enable_llm_cache: bool = False
+    llm_cache_ttl_seconds: int = 3600
+    llm_cache_max_entries: int = 10000  # In-memory only
     
     # Logging
-    log_level: str = Field("INFO", env="LOG_LEVEL")
-    log_format: str = Field("json", env="LOG_FORMAT")
+    log_level: str = "INFO"
+    log_format: str = "json"
     
     # Model Defaults
-    default_model: str = Field("gpt-3.5-turbo", env="DEFAULT_MODEL")
-    enabled_providers: str = Field("openai", env="ENABLED_PROVIDERS")  # comma-separated list
-    max_tokens: int = Field(1000, env="MAX_TOKENS")
-    temperature: float = Field(0.7, env="TEMPERATURE")
-    top_p: float = Field(1.0, env="TOP_P")
-    frequency_penalty: float = Field(0.0, env="FREQUENCY_PENALTY")
+    default_model: str = "gpt-3.5-turbo"
+    enabled_providers: str = "openai"  # comma-separated list
+    max_tokens: int = 1000
+    temperature: float = 0.7
+    top_p: float = 1.0
+    frequency_penalty: float = 0.0
     
     # Security Detection
-    injection_keywords: str = Field(
-        "ignore previous,disregard instructions,act as,pretend to be,forget everything,new instructions",
-        env="INJECTION_KEYWORDS"
+    injection_keywords: Annotated[CommaSeparated, AfterValidator(_lowercase_all)] = (
+        "ignore previous,disregard instructions,act as,pretend to be,forget everything,new instructions"
     )
-    enable_toxicity_detection: bool = Field(False, env="ENABLE_TOXICITY_DETECTION")
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-    
-    @validator("allowed_origins")
-    def parse_allowed_origins(cls, v):
-        """Parse comma-separated origins into list"""
-        if isinstance(v, str):
-            return [origin.strip() for origin in v.split(",") if origin.strip()]
-        return v
-    
-    @validator("allowed_hosts")
-    def parse_allowed_hosts(cls, v):
-        """Parse comma-separated hosts into list"""
-        if isinstance(v, str):
-            return [host.strip() for host in v.split(",") if host.strip()]
-        return v
-    
-    @validator("allowed_file_types")
-    def parse_allowed_file_types(cls, v):
-        """Parse comma-separated file types into list"""
-        if isinstance(v, str):
-            return [ext.strip() for ext in v.split(",") if ext.strip()]
-        return v
-    
-    @validator("injection_keywords")
-    def parse_injection_keywords(cls, v):
-        """Parse comma-separated keywords into list"""
-        if isinstance(v, str):
-            return [keyword.strip().lower() for keyword in v.split(",") if keyword.strip()]
-        return v
-    
-    @property
-    def ALLOWED_ORIGINS(self) -> List[str]:
+    enable_toxicity_detection: bool = False
+    
+    @cached_property
+    def ALLOWED_ORIGINS(self) -> Tuple[str, ...]:
         """Get parsed allowed origins"""
         return self.allowed_origins
     
-    @property
-    def ALLOWED_HOSTS(self) -> List[str]:
+    @cached_property
+    def ALLOWED_HOSTS(self) -> Tuple[str, ...]:
         """Get parsed allowed hosts"""
         return self.allowed_hosts
     
-    @property
-    def ALLOWED_FILE_TYPES(self) -> List[str]:
+    @cached_property
+    def ALLOWED_FILE_TYPES(self) -> Tuple[str, ...]:
         """Get parsed allowed file types"""
         return self.allowed_file_types
     
-    @property
-    def INJECTION_KEYWORDS(self) -> List[str]:
+    @cached_property
+    def INJECTION_KEYWORDS(self) -> Tuple[str, ...]:
         """Get parsed injection keywords"""
         return self.injection_keywords
     
-    @property
+    @cached_property
+    def INJECTION_KEYWORDS_RE(self) -> re.Pattern:
+        """Get injection keywords compiled into a single case-insensitive pattern"""
+        if not self.injection_keywords:
+            return re.compile(r"(?!)")  # Never matches
+        # Longest first, so a keyword that starts with a shorter one is matched whole
+        keywords = sorted(self.injection_keywords, key=len, reverse=True)
+        return re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+    
+    @cached_property
     def MAX_FILE_SIZE_BYTES(self) -> int:
         """Get max file size in bytes"""
         return self.max_file_size_mb * 1024 * 1024
 
 
-# Create global settings instance
-settings = Settings() 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings, constructed once on first use
+    
+    Use as a FastAPI dependency (Depends(get_settings)) so tests can override it.
+    """
+    return Settings()
+
+
+# Global settings instance for import-time configuration (middleware, rate limits)
+settings = get_settings() 
\ No newline at end of file
@@ -3,102 +3,209 @@ Security middleware for the LLM Evaluation Tool
 Provides request validation, security headers, and basic protection
 """
 
+import asyncio
+import contextlib
+import re
 import time
-import json
-from typing import Dict, List, Optional
-from fastapi import Request, Response, HTTPException
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Dict, List, Optional, Tuple
+import orjson
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
 
-from app.config import settings
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Monotonic clock for all interval math, bound once to skip the module lookup
+_monotonic = time.monotonic
 
-class SecurityMiddleware(BaseHTTPMiddleware):
+# User agents of common scanners and automated clients
+_SUSPICIOUS_AGENT_RE = re.compile(
+    r"scanner|bot|crawler|scraper|hack|test|sqlmap|nikto|nmap|masscan",
+    re.IGNORECASE
+)
+
+# Security headers added to every response, pre-encoded as raw ASGI headers
+_SECURITY_HEADERS_BYTES: List[Tuple[bytes, bytes]] = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"server", b"LLM-Eval-API"),  # Hide actual server information
+]
+
+# Only add HSTS in production with HTTPS
+_PRODUCTION_SECURITY_HEADERS_BYTES: List[Tuple[bytes, bytes]] = _SECURITY_HEADERS_BYTES + [
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+]
+
+# Content types accepted for request bodies
+_ALLOWED_CONTENT_TYPES = (
+    "application/json",
+    "multipart/form-data",
+    "application/x-www-form-urlencoded",
+)
+
+# Raw header names as they appear in the ASGI scope (always lowercase)
+_H_FORWARDED_FOR = b"x-forwarded-for"
+_H_REAL_IP = b"x-real-ip"
+_H_USER_AGENT = b"user-agent"
+_H_CONTENT_TYPE = b"content-type"
+_H_CONTENT_LENGTH = b"content-length"
+
+# Control characters that indicate header injection attempts
+_BAD_HEADER_RE = re.compile(rb"[\r\n\x00]")
+
+# Token bucket limits as (capacity, refill rate per second)
+_RATE_LIMIT = (30, 30 / 60.0)   # 30 requests per minute
+_BURST_LIMIT = (20, 2.0)        # 20 requests in 10 seconds
+
+# Per-IP bucket state is split over this many shards (must be a power of two)
+_NUM_SHARDS = 16
+_SHARD_MASK = _NUM_SHARDS - 1
+
+# Seconds between sweeps that evict idle client IPs
+_BUCKET_SWEEP_INTERVAL = 60.0
+
+
+class SecurityMiddleware:
     """
     Security middleware providing:
     - Security headers
     - Request validation
     - Basic request logging
     - Size limits enforcement
+    
+    Implemented as a pure ASGI middleware so response bodies are passed
+    through untouched instead of being buffered by BaseHTTPMiddleware.
     """
     
-    def __init__(self, app):
-        super().__init__(app)
-        self.start_time = time.time()
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.start_time = _monotonic()
         
-        # Track request patterns for basic anomaly detection
-        self.request_patterns: Dict[str, List[float]] = {}
-        self.max_pattern_history = 100
+        # Security headers appended to every response
+        if get_settings().environment == "production":
+            self.security_headers = _PRODUCTION_SECURITY_HEADERS_BYTES
+        else:
+            self.security_headers = _SECURITY_HEADERS_BYTES
+        self.security_header_names = frozenset(name for name, _ in self.security_headers)
+        
+        # Attach request fields to log records when logs are emitted as JSON
+        self.structured_logs = get_settings().log_format.lower() == "json"
+        
+        # Token buckets per client IP for basic anomaly detection, stored as
+        # (tokens, last_refill) and sharded by IP hash to keep each dict small.
+        # All access happens on the event loop thread, so no locks are needed.
+        self.bucket_shards: List[Dict[str, Tuple[float, float]]] = [{} for _ in range(_NUM_SHARDS)]
+        self.burst_bucket_shards: List[Dict[str, Tuple[float, float]]] = [{} for _ in range(_NUM_SHARDS)]
+        self.sweep_task: Optional[asyncio.Task] = None
+        self.total_requests = 0
+        self.flagged_requests = 0
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
         Process each request through security checks
         """
-        start_time = time.time()
-        client_ip = self.get_client_ip(request)
+        if scope["type"] == "lifespan":
+            await self.app(scope, self.lifespan_receive(receive), send)
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = _monotonic()
+        
+        # Read the raw header list once (last value wins) and pass the
+        # request details to every check
+        headers = dict(scope["headers"])
+        method = scope["method"]
+        path = scope["path"]
+        client_ip = self.get_client_ip(scope, headers)
+        user_agent = headers.get(_H_USER_AGENT, b"").decode("latin-1")
+        content_type = headers.get(_H_CONTENT_TYPE, b"").decode("latin-1")
+        content_length = headers.get(_H_CONTENT_LENGTH, b"").decode("latin-1")
+        
+        response_started = False
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal response_started, status_code
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                message["headers"] = self.add_security_headers(message.get("headers", []))
+            await send(message)
         
         try:
             # Pre-request security checks
-            await self.validate_request_size(request)
-            await self.validate_request_headers(request)
+            await self.validate_request_size(content_length)
+            await self.validate_request_headers(scope["headers"], method, user_agent, content_type)
             
             # Log request
-            self.log_request(request, client_ip)
+            self.log_request(method, path, client_ip, user_agent, content_length)
             
             # Process request
-            response = await call_next(request)
-            
-            # Post-request processing
-            response = self.add_security_headers(response)
+            await self.app(scope, receive, send_wrapper)
             
             # Log response
-            processing_time = time.time() - start_time
-            self.log_response(request, response, processing_time, client_ip)
-            
-            return response
+            processing_time = _monotonic() - start_time
+            self.log_response(method, path, status_code, processing_time, client_ip)
             
         except HTTPException as e:
-            logger.warning(f"Security middleware blocked request from {client_ip}: {e.detail}")
-            return JSONResponse(
-                status_code=e.status_code,
-                content={"detail": e.detail, "error": "Security violation"}
+            logger.warning("Security middleware blocked request from %s: %s", client_ip, e.detail)
+            await self.send_json_error(
+                send_wrapper, e.status_code, {"detail": e.detail, "error": "Security violation"}
             )
         except Exception as e:
-            logger.error(f"Security middleware error: {str(e)}")
-            return JSONResponse(
-                status_code=500,
-                content={"detail": "Internal security error"}
-            )
+            if response_started:
+                # Too late to replace the response, let the server handle it
+                raise
+            logger.error("Security middleware error: %s", e)
+            await self.send_json_error(send_wrapper, 500, {"detail": "Internal security error"})
+    
+    async def send_json_error(self, send: Send, status_code: int, content: Dict):
+        """
+        Send a JSON error response directly as ASGI messages
+        """
+        body = orjson.dumps(content)
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
     
-    def get_client_ip(self, request: Request) -> str:
+    def get_client_ip(self, scope: Scope, headers: Dict[bytes, bytes]) -> str:
         """
         Extract client IP address from request
         Handles proxy headers for accurate IP detection
         """
         # Check for forwarded headers (common in production)
-        forwarded_for = request.headers.get("X-Forwarded-For")
+        forwarded_for = headers.get(_H_FORWARDED_FOR)
         if forwarded_for:
             # Take the first IP in the chain
-            return forwarded_for.split(",")[0].strip()
+            return forwarded_for.partition(b",")[0].strip().decode("latin-1")
         
-        real_ip = request.headers.get("X-Real-IP")
+        real_ip = headers.get(_H_REAL_IP)
         if real_ip:
-            return real_ip
+            return real_ip.decode("latin-1")
         
         # Fallback to direct client IP
-        if hasattr(request.client, "host"):
-            return request.client.host
+        client = scope.get("client")
+        if client:
+            return client[0]
         
         return "unknown"
     
-    async def validate_request_size(self, request: Request):
+    async def validate_request_size(self, content_length: str):
         """
         Validate request size to prevent oversized payloads
         """
-        content_length = request.headers.get("content-length")
         if content_length:
             try:
                 size = int(content_length)
@@ -114,176 +221,203 @@ class SecurityMiddleware(BaseHTTPMiddleware):
                 # Invalid content-length header
                 pass
     
-    async def validate_request_headers(self, request: Request):
+    async def validate_request_headers(
+        self,
+        raw_headers: List[Tuple[bytes, bytes]],
+        method: str,
+        user_agent: str,
+        content_type: str
+    ):
         """
         Validate request headers for security issues
         """
-        # Check for suspicious user agents
-        user_agent = request.headers.get("user-agent", "").lower()
-        suspicious_agents = [
-            "scanner", "bot", "crawler", "scraper", "hack", "test",
-            "sqlmap", "nikto", "nmap", "masscan"
-        ]
-        
-        for suspicious in suspicious_agents:
-            if suspicious in user_agent:
-                logger.warning(f"Suspicious user agent detected: {user_agent}")
-                # Don't block, just log for now
-                break
+        # Check for suspicious user agents (don't block, just log for now)
+        if _SUSPICIOUS_AGENT_RE.search(user_agent):
+            logger.warning("Suspicious user agent detected: %s", user_agent.lower())
         
         # Validate content-type for POST requests
-        if request.method in ["POST", "PUT", "PATCH"]:
-            content_type = request.headers.get("content-type", "")
-            if content_type and not any(allowed in content_type.lower() for allowed in [
-                "application/json", "multipart/form-data", "application/x-www-form-urlencoded"
-            ]):
-                logger.warning(f"Unusual content-type: {content_type}")
+        if method in ["POST", "PUT", "PATCH"]:
+            if content_type and not content_type.lower().startswith(_ALLOWED_CONTENT_TYPES):
+                logger.warning("Unusual content-type: %s", content_type)
         
         # Check for potential header injection
-        for header_name, header_value in request.headers.items():
-            if any(char in header_value for char in ['\n', '\r', '\0']):
+        for header_name, header_value in raw_headers:
+            if _BAD_HEADER_RE.search(header_value):
                 raise HTTPException(
                     status_code=400,
                     detail="Invalid characters in headers"
                 )
     
-    def add_security_headers(self, response: Response) -> Response:
+    def add_security_headers(self, headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
         """
-        Add security headers to the response
+        Add security headers to the raw response headers
         """
-        # Security headers
-        security_headers = {
-            "X-Content-Type-Options": "nosniff",
-            "X-Frame-Options": "DENY",
-            "X-XSS-Protection": "1; mode=block",
-            "Referrer-Policy": "strict-origin-when-cross-origin",
-            "Server": "LLM-Eval-API",  # Hide actual server information
-        }
-        
-        # Only add HSTS in production with HTTPS
-        if settings.environment == "production":
-            security_headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        
-        # Add headers to response
-        for header, value in security_headers.items():
-            response.headers[header] = value
-        
-        return response
+        # Security headers override any value set by the application
+        return [
+            (name, value) for name, value in headers
+            if name.lower() not in self.security_header_names
+        ] + self.security_headers
     
-    def log_request(self, request: Request, client_ip: str):
+    def log_request(self, method: str, path: str, client_ip: str, user_agent: str, content_length: str):
         """
         Log incoming requests for monitoring
         """
-        # Basic request logging
-        log_data = {
-            "method": request.method,
-            "url": str(request.url),
-            "client_ip": client_ip,
-            "user_agent": request.headers.get("user-agent", "unknown"),
-            "content_length": request.headers.get("content-length", "0"),
-            "timestamp": time.time()
-        }
-        
         # Log at different levels based on request type
-        if request.url.path.startswith("/api/v1/evaluate"):
-            logger.info(f"Evaluation request from {client_ip}: {request.method} {request.url.path}")
-        elif request.url.path.startswith("/api/v1/upload"):
-            logger.info(f"Upload request from {client_ip}: {request.method} {request.url.path}")
+        if path.startswith("/api/v1/evaluate"):
+            level, kind = logging.INFO, "Evaluation request"
+        elif path.startswith("/api/v1/upload"):
+            level, kind = logging.INFO, "Upload request"
         else:
-            logger.debug(f"Request from {client_ip}: {request.method} {request.url.path}")
+            level, kind = logging.DEBUG, "Request"
+        
+        # Skip building the record entirely when the level is disabled
+        if logger.isEnabledFor(level):
+            extra = None
+            if self.structured_logs:
+                extra = {
+                    "method": method,
+                    "path": path,
+                    "client_ip": client_ip,
+                    "user_agent": user_agent or "unknown",
+                    "content_length": content_length or "0",
+                }
+            logger.log(level, "%s from %s: %s %s", kind, client_ip, method, path, extra=extra)
         
         # Track request patterns for anomaly detection
         self.track_request_pattern(client_ip)
     
-    def log_response(self, request: Request, response: Response, processing_time: float, client_ip: str):
+    def log_response(self, method: str, path: str, status_code: int, processing_time: float, client_ip: str):
         """
         Log response information
         """
         # Log slow requests
         if processing_time > 5.0:  # 5 seconds
             logger.warning(
-                f"Slow request from {client_ip}: {request.method} {request.url.path} "
-                f"took {processing_time:.2f}s"
+                "Slow request from %s: %s %s took %.2fs",
+                client_ip, method, path, processing_time
             )
         
         # Log error responses
-        if response.status_code >= 400:
-            if response.status_code >= 500:
+        if status_code >= 400:
+            if status_code >= 500:
                 logger.error(
-                    f"Server error for {client_ip}: {request.method} {request.url.path} "
-                    f"returned {response.status_code}"
+                    "Server error for %s: %s %s returned %d",
+                    client_ip, method, path, status_code
                 )
             else:
                 logger.warning(
-                    f"Client error for {client_ip}: {request.method} {request.url.path} "
-                    f"returned {response.status_code}"
+                    "Client error for %s: %s %s returned %d",
+                    client_ip, method, path, status_code
                 )
     
-    def track_request_pattern(self, client_ip: str):
+    def consume_token(
+        self,
+        buckets: Dict[str, Tuple[float, float]],
+        client_ip: str,
+        capacity: float,
+        refill_rate: float,
+        current_time: float
+    ) -> bool:
         """
-        Track request patterns for basic anomaly detection
-        """
-        current_time = time.time()
-        
-        if client_ip not in self.request_patterns:
-            self.request_patterns[client_ip] = []
-        
-        # Add current request timestamp
-        self.request_patterns[client_ip].append(current_time)
+        Take one token from the client's bucket, refilling it for the elapsed time
         
-        # Keep only recent requests (last hour)
-        hour_ago = current_time - 3600
-        self.request_patterns[client_ip] = [
-            timestamp for timestamp in self.request_patterns[client_ip]
-            if timestamp > hour_ago
-        ]
+        Returns:
+            Whether a token was available
+        """
+        tokens, last_refill = buckets.get(client_ip, (capacity, current_time))
+        tokens = min(capacity, tokens + (current_time - last_refill) * refill_rate)
         
-        # Limit history size
-        if len(self.request_patterns[client_ip]) > self.max_pattern_history:
-            self.request_patterns[client_ip] = self.request_patterns[client_ip][-self.max_pattern_history:]
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
         
-        # Check for rapid requests (potential abuse)
-        recent_requests = [
-            timestamp for timestamp in self.request_patterns[client_ip]
-            if timestamp > current_time - 60  # Last minute
-        ]
+        buckets[client_ip] = (tokens, current_time)
+        return allowed
+    
+    def track_request_pattern(self, client_ip: str):
+        """
+        Track request patterns for basic anomaly detection
+        """
+        current_time = _monotonic()
+        self.total_requests += 1
+        shard = hash(client_ip) & _SHARD_MASK
         
-        if len(recent_requests) > 30:  # More than 30 requests per minute
+        # Check for rapid requests (potential abuse): 30 requests per minute
+        if not self.consume_token(self.bucket_shards[shard], client_ip, *_RATE_LIMIT, current_time):
+            self.flagged_requests += 1
             logger.warning(
-                f"High request rate from {client_ip}: {len(recent_requests)} requests in the last minute"
+                "High request rate from %s: more than 30 requests per minute", client_ip
             )
         
-        # Check for very rapid requests (potential DDoS)
-        very_recent = [
-            timestamp for timestamp in self.request_patterns[client_ip]
-            if timestamp > current_time - 10  # Last 10 seconds
-        ]
-        
-        if len(very_recent) > 20:  # More than 20 requests in 10 seconds
+        # Check for very rapid requests (potential DDoS): 20 requests in 10 seconds
+        if not self.consume_token(self.burst_bucket_shards[shard], client_ip, *_BURST_LIMIT, current_time):
+            self.flagged_requests += 1
             logger.error(
-                f"Potential DDoS from {client_ip}: {len(very_recent)} requests in 10 seconds"
+                "Potential DDoS from %s: more than 20 requests in 10 seconds", client_ip
             )
     
     def get_security_stats(self) -> Dict:
         """
         Get security statistics for monitoring
         """
-        current_time = time.time()
-        hour_ago = current_time - 3600
+        return {
+            "total_requests": self.total_requests,
+            "flagged_requests": self.flagged_requests,
+            "uptime_seconds": _monotonic() - self.start_time,
+            "tracked_ips": sum(len(shard) for shard in self.bucket_shards)
+        }
+    
+    def lifespan_receive(self, receive: Receive) -> Receive:
+        """
+        Wrap the lifespan receive channel to run the idle-bucket sweeper
         
-        active_ips = len([
-            ip for ip, timestamps in self.request_patterns.items()
-            if any(timestamp > hour_ago for timestamp in timestamps)
-        ])
+        The sweeper starts when the application starts up and is cancelled
+        and awaited when it shuts down.
+        """
+        async def wrapped_receive() -> Message:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.start_sweep_task()
+            elif message["type"] == "lifespan.shutdown":
+                await self.stop_sweep_task()
+            return message
         
-        total_requests = sum(
-            len([timestamp for timestamp in timestamps if timestamp > hour_ago])
-            for timestamps in self.request_patterns.values()
-        )
+        return wrapped_receive
+    
+    def start_sweep_task(self):
+        """Start the idle-bucket sweeper on the running event loop"""
+        if self.sweep_task is None or self.sweep_task.done():
+            self.sweep_task = asyncio.create_task(self.sweep_idle_buckets())
+    
+    async def stop_sweep_task(self):
+        """Cancel the idle-bucket sweeper and wait for it to finish"""
+        task, self.sweep_task = self.sweep_task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+    
+    async def sweep_idle_buckets(self):
+        """
+        Periodically evict client IPs whose buckets have refilled completely
+        """
+        while True:
+            await asyncio.sleep(_BUCKET_SWEEP_INTERVAL)
+            self.evict_idle_buckets(_monotonic())
+    
+    def evict_idle_buckets(self, current_time: float):
+        """
+        Drop bucket entries idle long enough to be full again
         
-        return {
-            "active_ips_last_hour": active_ips,
-            "total_requests_last_hour": total_requests,
-            "uptime_seconds": current_time - self.start_time,
-            "tracked_ips": len(self.request_patterns)
-        } 
\ No newline at end of file
+        A full bucket behaves exactly like a missing one, so eviction never
+        changes rate limiting decisions.
+        """
+        for shards, (capacity, refill_rate) in (
+            (self.bucket_shards, _RATE_LIMIT),
+            (self.burst_bucket_shards, _BURST_LIMIT),
+        ):
+            cutoff = current_time - capacity / refill_rate
+            for shard in shards:
+                stale = [ip for ip, (_, last_refill) in shard.items() if last_refill <= cutoff]
+                for ip in stale:
+                    del shard[ip]
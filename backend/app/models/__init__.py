@@ -1,61 +1,65 @@
 """
 Models package for LLM Evaluation Tool
 Exports all Pydantic models for easy importing
+
+Models are imported lazily on first access (PEP 562), so importing the
+package itself does not build every schema.
 """
 
-from .schemas import (
+import importlib
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
     # Enums
-    ModelName,
-    ExportFormat,
-    
+    "Provider": "schemas",
+    "ModelName": "schemas",
+    "ExportFormat": "schemas",
+
     # Upload Models
-    PromptData,
-    UploadResponse,
-    
+    "PromptData": "schemas",
+    "UploadResponse": "schemas",
+
     # Evaluation Models
-    ModelParameters,
-    EvaluationRequest,
-    EvaluationResult,
-    EvaluationResponse,
-    EvaluationProgress,
-    AdvancedMetrics,
-    
+    "ModelParameters": "schemas",
+    "ModelInfo": "schemas",
+    "EvaluationRequest": "schemas",
+    "EvaluationResult": "schemas",
+    "EvaluationResponse": "schemas",
+    "EvaluationProgress": "schemas",
+    "AdvancedMetrics": "schemas",
+
     # Export Models
-    ExportRequest,
-    ExportResponse,
-    
+    "ExportRequest": "schemas",
+    "ExportResponse": "schemas",
+
     # Security Models
-    SecurityAlert,
-    SecurityAnalysis,
-    
+    "SecurityAlert": "schemas",
+    "SecurityAnalysis": "schemas",
+
     # Common Models
-    ErrorResponse,
-    HealthCheck,
-    
+    "ErrorResponse": "schemas",
+    "HealthCheck": "schemas",
+
     # Summary Models
-    EvaluationSummary,
-    AdvancedMetricsSummary,
-    ScoreDistribution,
-)
-
-__all__ = [
-    "ModelName",
-    "ExportFormat",
-    "PromptData",
-    "UploadResponse",
-    "ModelParameters",
-    "EvaluationRequest",
-    "EvaluationResult",
-    "EvaluationResponse",
-    "EvaluationProgress",
-    "AdvancedMetrics",
-    "ExportRequest",
-    "ExportResponse",
-    "SecurityAlert",
-    "SecurityAnalysis",
-    "ErrorResponse",
-    "HealthCheck",
-    "EvaluationSummary",
-    "AdvancedMetricsSummary",
-    "ScoreDistribution",
-] 
\ No newline at end of file
+    "EvaluationSummary": "schemas",
+    "AdvancedMetricsSummary": "schemas",
+    "ScoreDistribution": "schemas",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import exported models on first access"""
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,74 @@
+"""
+Internal data structures for the evaluation engine
+Lightweight containers used inside evaluation loops, converted to the
+Pydantic schemas only at the API boundary
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Union
+
+from .schemas import AdvancedMetrics, EvaluationResult, ModelParameters
+
+
+class AdvancedMetricsData(NamedTuple):
+    """Advanced metrics computed for a single response"""
+    bleu_score: float
+    rouge_scores: Dict[str, Dict[str, float]]
+    semantic_similarity: Dict[str, float]
+
+    def to_schema(self) -> AdvancedMetrics:
+        """Convert to the API schema without re-running validation"""
+        return AdvancedMetrics.model_construct(
+            bleu_score=self.bleu_score,
+            rouge_scores=self.rouge_scores,
+            semantic_similarity=self.semantic_similarity
+        )
+
+
+@dataclass(slots=True)
+class InternalEvaluationResult:
+    """Evaluation result as produced by the evaluation engine"""
+    id: Union[int, str]
+    prompt: str
+    model_response: str
+    expected_output: str
+    exact_match: float
+    fuzzy_match: float
+    toxicity: bool
+    model: str
+    timestamp: str
+    provider: Optional[str] = None
+    parameters: Optional[ModelParameters] = None
+    security_flags: Optional[List[str]] = None
+    advanced_metrics: Optional[AdvancedMetricsData] = None
+
+    def __post_init__(self):
+        # Every result in a batch carries the same model/provider names, so
+        # share one string object between them
+        self.model = sys.intern(self.model)
+        if self.provider:
+            self.provider = sys.intern(self.provider)
+
+    def to_schema(self) -> EvaluationResult:
+        """
+        Convert to the API schema
+
+        The scores are computed by the engine itself, so field validation is
+        skipped and the model is constructed directly.
+        """
+        return EvaluationResult.model_construct(
+            id=self.id,
+            prompt=self.prompt,
+            model_response=self.model_response,
+            expected_output=self.expected_output,
+            exact_match=self.exact_match,
+            fuzzy_match=self.fuzzy_match,
+            toxicity=self.toxicity,
+            model=self.model,
+            provider=self.provider,
+            timestamp=self.timestamp,
+            parameters=self.parameters,
+            security_flags=self.security_flags,
+            advanced_metrics=self.advanced_metrics.to_schema() if self.advanced_metrics else None
+        )
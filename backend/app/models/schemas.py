@@ -3,10 +3,11 @@ Pydantic models for API requests and responses
 Matches frontend data structures and expectations
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any, Union
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import List, Optional, Dict, Any, Mapping, Tuple, Union
 from datetime import datetime
 from enum import Enum
+from types import MappingProxyType
 
 
 class Provider(str, Enum):
@@ -46,6 +47,39 @@ class ModelName(str, Enum):
     LLAMA_2 = "llama3-70b-8192"  # Map to Llama 3 70B
 
 
+# Model name (including legacy aliases) -> (provider, canonical model id).
+# ModelName documents the accepted values at the API boundary; routing code
+# resolves names through this table with a single lookup.
+MODEL_TABLE: Mapping[str, Tuple[Provider, str]] = MappingProxyType({
+    ModelName.GPT_4.value: (Provider.OPENAI, ModelName.GPT_4.value),
+    ModelName.GPT_35_TURBO.value: (Provider.OPENAI, ModelName.GPT_35_TURBO.value),
+    ModelName.GPT_4_TURBO.value: (Provider.OPENAI, ModelName.GPT_4_TURBO.value),
+    ModelName.CLAUDE_3_OPUS.value: (Provider.ANTHROPIC, ModelName.CLAUDE_3_OPUS.value),
+    ModelName.CLAUDE_3_SONNET.value: (Provider.ANTHROPIC, ModelName.CLAUDE_3_SONNET.value),
+    ModelName.CLAUDE_3_HAIKU.value: (Provider.ANTHROPIC, ModelName.CLAUDE_3_HAIKU.value),
+    ModelName.GEMINI_1_5_PRO.value: (Provider.GOOGLE, ModelName.GEMINI_1_5_PRO.value),
+    ModelName.GEMINI_1_5_FLASH.value: (Provider.GOOGLE, ModelName.GEMINI_1_5_FLASH.value),
+    ModelName.GEMINI_PRO.value: (Provider.GOOGLE, ModelName.GEMINI_PRO.value),
+    ModelName.LLAMA3_70B.value: (Provider.GROQ, ModelName.LLAMA3_70B.value),
+    ModelName.LLAMA3_8B.value: (Provider.GROQ, ModelName.LLAMA3_8B.value),
+    ModelName.MIXTRAL_8X7B.value: (Provider.GROQ, ModelName.MIXTRAL_8X7B.value),
+    # Legacy short names
+    "claude-3": (Provider.ANTHROPIC, ModelName.CLAUDE_3_SONNET.value),
+    "llama-2": (Provider.GROQ, ModelName.LLAMA3_70B.value),
+})
+
+
+def resolve_model(name: str) -> Optional[Tuple[Provider, str]]:
+    """
+    Resolve a model name or legacy alias to its provider and canonical id
+    
+    Returns:
+        (provider, model id) tuple, or None for models not in the table
+        (e.g. models served by a custom provider)
+    """
+    return MODEL_TABLE.get(name)
+
+
 class ExportFormat(str, Enum):
     """Supported export formats"""
     CSV = "csv"
@@ -58,12 +92,6 @@ class PromptData(BaseModel):
     prompt: str = Field(..., description="The input prompt")
     expected_output: str = Field(..., description="Expected model response")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
-    
-    @validator("prompt", "expected_output")
-    def validate_not_empty(cls, v):
-        if not v or not v.strip():
-            raise ValueError("Field cannot be empty")
-        return v.strip()
 
 
 class UploadResponse(BaseModel):
@@ -104,13 +132,33 @@ class EvaluationRequest(BaseModel):
     model: ModelName = Field(..., description="Selected model for evaluation")
     parameters: Optional[ModelParameters] = Field(None, description="Model parameters")
     
-    @validator("prompts")
-    def validate_prompts_not_empty(cls, v):
-        if not v:
+    @model_validator(mode="before")
+    @classmethod
+    def validate_prompts(cls, data: Any) -> Any:
+        """Check the prompt count and strip/require every prompt's text in one pass"""
+        if not isinstance(data, dict) or not isinstance(data.get("prompts"), list):
+            return data  # Let field validation report type errors
+        
+        prompts = data["prompts"]
+        if not prompts:
             raise ValueError("Prompts list cannot be empty")
-        if len(v) > 100:  # Reasonable limit
+        if len(prompts) > 100:  # Reasonable limit
             raise ValueError("Maximum 100 prompts per evaluation")
-        return v
+        
+        cleaned = []
+        for index, item in enumerate(prompts):
+            if isinstance(item, dict):
+                item = dict(item)
+                for field in ("prompt", "expected_output"):
+                    value = item.get(field)
+                    if isinstance(value, str):
+                        value = value.strip()
+                        if not value:
+                            raise ValueError(f"prompts[{index}].{field} cannot be empty")
+                        item[field] = value
+            cleaned.append(item)
+        
+        return {**data, "prompts": cleaned}
 
 
 class AdvancedMetrics(BaseModel):
@@ -119,8 +167,7 @@ class AdvancedMetrics(BaseModel):
     rouge_scores: Dict[str, Dict[str, float]] = Field(..., description="ROUGE scores (precision, recall, f1)", alias="rougeScores")
     semantic_similarity: Dict[str, float] = Field(..., description="Semantic similarity scores", alias="semanticSimilarity")
     
-    class Config:
-        allow_population_by_field_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class EvaluationResult(BaseModel):
@@ -139,8 +186,7 @@ class EvaluationResult(BaseModel):
     security_flags: Optional[List[str]] = Field(None, description="Security warnings", alias="securityFlags")
     advanced_metrics: Optional[AdvancedMetrics] = Field(None, description="Advanced evaluation metrics", alias="advancedMetrics")
     
-    class Config:
-        allow_population_by_field_name = True
+    model_config = ConfigDict(populate_by_name=True, protected_namespaces=())
 
 
 class EvaluationResponse(BaseModel):
@@ -217,8 +263,7 @@ class AdvancedMetricsSummary(BaseModel):
     average_rouge_f1: Dict[str, float] = Field(..., description="Average ROUGE F1 scores", alias="averageRougeF1")
     average_semantic_similarity: Dict[str, float] = Field(..., description="Average semantic similarity scores", alias="averageSemanticSimilarity")
     
-    class Config:
-        allow_population_by_field_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class EvaluationSummary(BaseModel):
@@ -231,6 +276,9 @@ class EvaluationSummary(BaseModel):
     models_used: List[str] = Field(..., description="List of models used")
     evaluation_time: float = Field(..., description="Total evaluation time in seconds")
     advanced_metrics_summary: Optional[AdvancedMetricsSummary] = Field(None, description="Summary of advanced metrics", alias="advancedMetricsSummary")
+    score_distribution: List["ScoreDistribution"] = Field(default_factory=list, description="Score counts per range", alias="scoreDistribution")
+    
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class ScoreDistribution(BaseModel):
@@ -4,15 +4,16 @@ Handles evaluation requests, progress tracking, and result generation
 """
 
 import asyncio
+import bisect
 import time
+import numpy as np
+import orjson
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, HTTPException, Request, Depends, BackgroundTasks
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from fastapi import APIRouter, HTTPException, Request, Response, Depends, BackgroundTasks
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
-from app.config import settings
 from app.models import (
     EvaluationRequest,
     EvaluationResponse,
@@ -22,28 +23,58 @@ from app.models import (
     ErrorResponse,
     ModelParameters,
     ModelInfo,
-    PromptData
+    PromptData,
+    ScoreDistribution
 )
 from app.utils.evaluation import (
     evaluate_prompts_batch,
     evaluate_single_prompt,
     EvaluationError
 )
+from app.utils.cache import is_cacheable, result_cache
+from app.utils.limiter import evaluation_rate_limit, single_evaluation_rate_limit, stream_evaluation_rate_limit
+from app.utils.storage import evaluation_store
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-# Rate limiter for evaluation endpoints
-limiter = Limiter(key_func=get_remote_address)
+# Score ranges for the distribution chart, 25 points wide; each range includes
+# its upper bound, so 25 falls in "0-25%" and 100 in "76-100%"
+SCORE_RANGES = ("0-25%", "26-50%", "51-75%", "76-100%")
 
-# In-memory storage for evaluation results (in production, use a database)
-evaluation_results_store: Dict[str, List[EvaluationResult]] = {}
-evaluation_status_store: Dict[str, Dict[str, Any]] = {}
+# Inclusive upper bounds of every range but the last
+SCORE_RANGE_BOUNDS = (25.0, 50.0, 75.0)
+
+ROUGE_TYPES = ("rouge-1", "rouge-2", "rouge-l")
+SEMANTIC_METHODS = ("tfidf", "jaccard", "sequence")
+
+# Result count from which summaries are computed on NumPy arrays
+VECTORIZED_SUMMARY_MIN_RESULTS = 256
+
+# Security score of a result by its number of security flags (20 points each, 5+ flags score 0)
+SECURITY_SCORE_BY_FLAGS = np.array([100, 80, 60, 40, 20, 0], dtype=np.int64)
+
+
+def generate_score_distribution(exact_counts: List[int], fuzzy_counts: List[int]) -> List[ScoreDistribution]:
+    """
+    Build the score distribution from per-range counts
+    
+    Args:
+        exact_counts: Number of exact match scores in each score range
+        fuzzy_counts: Number of fuzzy match scores in each score range
+        
+    Returns:
+        One entry per score range
+    """
+    return [
+        ScoreDistribution(range=label, exact_match=int(exact), fuzzy_match=int(fuzzy))
+        for label, exact, fuzzy in zip(SCORE_RANGES, exact_counts, fuzzy_counts)
+    ]
 
 
 def generate_summary(results: List[EvaluationResult]) -> EvaluationSummary:
     """
-    Generate summary statistics from evaluation results
+    Generate summary statistics from evaluation results in a single pass
     
     Args:
         results: List of evaluation results
@@ -64,90 +95,124 @@ def generate_summary(results: List[EvaluationResult]) -> EvaluationSummary:
         )
     
     total_prompts = len(results)
+    if total_prompts >= VECTORIZED_SUMMARY_MIN_RESULTS:
+        return generate_summary_vectorized(results)
     
-    # Calculate averages
-    exact_scores = [r.exact_match for r in results]
-    fuzzy_scores = [r.fuzzy_match for r in results]
-    average_exact_match = sum(exact_scores) / total_prompts
-    average_fuzzy_match = sum(fuzzy_scores) / total_prompts
+    sum_exact = sum_fuzzy = sum_security = 0.0
+    flagged_prompts = 0
+    exact_counts = [0] * len(SCORE_RANGES)
+    fuzzy_counts = [0] * len(SCORE_RANGES)
+    models = set()
     
-    # Count flagged prompts (low scores or toxicity)
-    flagged_prompts = len([
-        r for r in results 
-        if r.exact_match < 50 or r.toxicity or (r.security_flags and len(r.security_flags) > 0)
-    ])
+    sum_bleu = 0.0
+    advanced_count = 0
+    rouge_sums = dict.fromkeys(ROUGE_TYPES, 0.0)
+    rouge_counts = dict.fromkeys(ROUGE_TYPES, 0)
+    semantic_sums = dict.fromkeys(SEMANTIC_METHODS, 0.0)
+    semantic_counts = dict.fromkeys(SEMANTIC_METHODS, 0)
     
-    # Calculate security score (average of individual security analyses)
-    security_scores = []
     for result in results:
-        if result.security_flags and len(result.security_flags) > 0:
-            # Lower score for flagged content
-            security_scores.append(max(0, 100 - len(result.security_flags) * 20))
-        else:
-            security_scores.append(100)
-    
-    security_score = sum(security_scores) / len(security_scores) if security_scores else 100.0
-    
-    # Get unique models used
-    models_used = list(set(r.model for r in results))
+        exact_match = result.exact_match
+        fuzzy_match = result.fuzzy_match
+        security_flags = result.security_flags
+        
+        sum_exact += exact_match
+        sum_fuzzy += fuzzy_match
+        exact_counts[bisect.bisect_left(SCORE_RANGE_BOUNDS, exact_match)] += 1
+        fuzzy_counts[bisect.bisect_left(SCORE_RANGE_BOUNDS, fuzzy_match)] += 1
+        models.add(result.model)
+        
+        # Flag low scores, toxicity or security warnings
+        if exact_match < 50 or result.toxicity or security_flags:
+            flagged_prompts += 1
+        
+        # Lower security score for flagged content
+        sum_security += max(0, 100 - len(security_flags) * 20) if security_flags else 100
+        
+        advanced_metrics = result.advanced_metrics
+        if advanced_metrics:
+            advanced_count += 1
+            sum_bleu += advanced_metrics.bleu_score
+            
+            rouge_scores = advanced_metrics.rouge_scores
+            for rouge_type in ROUGE_TYPES:
+                if rouge_type in rouge_scores:
+                    rouge_sums[rouge_type] += rouge_scores[rouge_type]["f1"]
+                    rouge_counts[rouge_type] += 1
+            
+            semantic_similarity = advanced_metrics.semantic_similarity
+            for method in SEMANTIC_METHODS:
+                if method in semantic_similarity:
+                    semantic_sums[method] += semantic_similarity[method]
+                    semantic_counts[method] += 1
     
     # Calculate advanced metrics summary
     advanced_metrics_summary = None
-    if any(r.advanced_metrics for r in results):
-        bleu_scores = [r.advanced_metrics.bleu_score for r in results if r.advanced_metrics]
-        average_bleu_score = sum(bleu_scores) / len(bleu_scores) if bleu_scores else 0.0
-        
-        # Calculate average ROUGE F1 scores
-        rouge_f1_scores = {"rouge-1": [], "rouge-2": [], "rouge-l": []}
-        for result in results:
-            if result.advanced_metrics:
-                for rouge_type in rouge_f1_scores:
-                    if rouge_type in result.advanced_metrics.rouge_scores:
-                        rouge_f1_scores[rouge_type].append(
-                            result.advanced_metrics.rouge_scores[rouge_type]["f1"]
-                        )
-        
-        average_rouge_f1 = {
-            rouge_type: sum(scores) / len(scores) if scores else 0.0
-            for rouge_type, scores in rouge_f1_scores.items()
-        }
-        
-        # Calculate average semantic similarity scores
-        semantic_scores = {"tfidf": [], "jaccard": [], "sequence": []}
-        for result in results:
-            if result.advanced_metrics:
-                for method in semantic_scores:
-                    if method in result.advanced_metrics.semantic_similarity:
-                        semantic_scores[method].append(
-                            result.advanced_metrics.semantic_similarity[method]
-                        )
-        
-        average_semantic_similarity = {
-            method: sum(scores) / len(scores) if scores else 0.0
-            for method, scores in semantic_scores.items()
-        }
-        
+    if advanced_count:
         advanced_metrics_summary = AdvancedMetricsSummary(
-            average_bleu_score=average_bleu_score,
-            average_rouge_f1=average_rouge_f1,
-            average_semantic_similarity=average_semantic_similarity
+            average_bleu_score=sum_bleu / advanced_count,
+            average_rouge_f1={
+                rouge_type: rouge_sums[rouge_type] / rouge_counts[rouge_type] if rouge_counts[rouge_type] else 0.0
+                for rouge_type in ROUGE_TYPES
+            },
+            average_semantic_similarity={
+                method: semantic_sums[method] / semantic_counts[method] if semantic_counts[method] else 0.0
+                for method in SEMANTIC_METHODS
+            }
         )
     
     return EvaluationSummary(
         total_prompts=total_prompts,
-        average_exact_match=average_exact_match,
-        average_fuzzy_match=average_fuzzy_match,
+        average_exact_match=sum_exact / total_prompts,
+        average_fuzzy_match=sum_fuzzy / total_prompts,
         flagged_prompts=flagged_prompts,
-        security_score=security_score,
-        models_used=models_used,
+        security_score=sum_security / total_prompts,
+        models_used=list(models),
         evaluation_time=0.0,  # Will be calculated by the endpoint
-        advanced_metrics_summary=advanced_metrics_summary
+        advanced_metrics_summary=advanced_metrics_summary,
+        score_distribution=generate_score_distribution(exact_counts, fuzzy_counts)
+    )
+
+
+async def finalize_evaluation(
+    evaluation_id: str,
+    results: List[EvaluationResult],
+    summary: EvaluationSummary,
+    cache_entries: Dict[str, EvaluationResult]
+):
+    """
+    Persist a finished evaluation
+    
+    Runs as a background task once the response has been sent: stores the
+    results for export, caches new results, and marks the evaluation as
+    completed with its summary.
+    """
+    try:
+        await evaluation_store.set_results(evaluation_id, results)
+        await result_cache.set_many(cache_entries)
+        await evaluation_store.update_status(
+            evaluation_id,
+            status="completed",
+            progress=len(results),
+            percentage=100.0,
+            completed_at_ns=time.time_ns(),
+            evaluation_time=summary.evaluation_time,
+            summary=summary.model_dump(mode="json")
+        )
+    except Exception as e:
+        logger.error("Failed to store evaluation %s: %s", evaluation_id, e, exc_info=True)
+        return
+    
+    logger.info(
+        "Completed evaluation %s: %d results, avg exact: %.1f%%, avg fuzzy: %.1f%%",
+        evaluation_id, len(results), summary.average_exact_match, summary.average_fuzzy_match
     )
 
 
 @router.post(
     "/evaluate",
     response_model=EvaluationResponse,
+    dependencies=[Depends(evaluation_rate_limit)],
     responses={
         400: {"model": ErrorResponse, "description": "Bad request - validation error"},
         429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
@@ -156,9 +221,10 @@ def generate_summary(results: List[EvaluationResult]) -> EvaluationSummary:
     summary="Run LLM evaluation",
     description="Evaluate prompts against the selected LLM model and return detailed results"
 )
-@limiter.limit(f"{settings.evaluation_rate_limit_per_minute}/minute")
 async def evaluate_prompts(
     request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
     evaluation_request: EvaluationRequest
 ):
     """
@@ -184,6 +250,10 @@ async def evaluate_prompts(
     - Toxicity detection (placeholder implementation)
     - Security flags for suspicious content
     
+    **Caching:**
+    - With temperature 0, results for previously evaluated prompts are served
+      from cache; the number of cached results is returned in `X-Cache-Hits`
+    
     **Rate Limiting:**
     - Limited to {settings.evaluation_rate_limit_per_minute} requests per minute per IP
     - Batch processing for efficient API usage
@@ -191,7 +261,7 @@ async def evaluate_prompts(
     start_time = time.time()
     evaluation_id = f"eval_{int(time.time() * 1000)}"
     
-    logger.info(f"Starting evaluation {evaluation_id} with {len(evaluation_request.prompts)} prompts using {evaluation_request.model}")
+    logger.info("Starting evaluation %s with %d prompts using %s", evaluation_id, len(evaluation_request.prompts), evaluation_request.model)
     
     try:
         # Validate request
@@ -208,34 +278,67 @@ async def evaluate_prompts(
             )
         
         # Initialize progress tracking
-        evaluation_status_store[evaluation_id] = {
+        await evaluation_store.set_status(evaluation_id, {
             "status": "running",
             "progress": 0,
             "total": len(evaluation_request.prompts),
-            "started_at": datetime.utcnow().isoformat()
-        }
+            "started_at_ns": time.time_ns()
+        })
+        
+        # Serve previously evaluated prompts from the exact-match cache
+        prompts = evaluation_request.prompts
+        model = evaluation_request.model.value
+        parameters = evaluation_request.parameters
+        cacheable = is_cacheable(parameters)
         
-        # Progress callback for tracking
+        cache_keys = [result_cache.key(p, model, parameters) for p in prompts] if cacheable else []
+        cached_results = await result_cache.get_many(cache_keys) if cacheable else [None] * len(prompts)
+        miss_indices = [index for index, cached in enumerate(cached_results) if cached is None]
+        cache_hits = len(prompts) - len(miss_indices)
+        
+        # Cached results keep the time of the evaluation that produced them;
+        # report them as part of this evaluation instead
+        if cache_hits:
+            timestamp = datetime.utcnow().isoformat()
+            for cached in cached_results:
+                if cached is not None:
+                    cached.timestamp = timestamp
+        
+        # Progress callback for tracking (cached prompts count as done)
         async def progress_callback(current: int, total: int, percentage: float):
-            evaluation_status_store[evaluation_id].update({
-                "progress": current,
-                "percentage": percentage,
-                "status": "running"
-            })
+            done = cache_hits + current
+            await evaluation_store.update_status(
+                evaluation_id,
+                progress=done,
+                percentage=min(100.0, done / len(prompts) * 100)
+            )
         
-        # Run evaluation
+        # Run evaluation for the prompts not in the cache
         try:
-            results = await evaluate_prompts_batch(
-                evaluation_request.prompts,
-                evaluation_request.model.value,
-                evaluation_request.parameters,
-                batch_size=5,  # Process 5 prompts concurrently
+            evaluated = await evaluate_prompts_batch(
+                [prompts[index] for index in miss_indices],
+                model,
+                parameters,
                 progress_callback=progress_callback
-            )
+            ) if miss_indices else []
         except EvaluationError as e:
-            logger.error(f"Evaluation error for {evaluation_id}: {str(e)}")
+            logger.error("Evaluation error for %s: %s", evaluation_id, e)
             raise HTTPException(status_code=400, detail=str(e))
         
+        # Reassemble results in request order
+        results = cached_results
+        new_cache_entries = {}
+        for index, result in zip(miss_indices, evaluated):
+            results[index] = result
+            if cacheable and not str(result.id).startswith("error_"):
+                new_cache_entries[cache_keys[index]] = result
+        for index, result in enumerate(results):
+            if not str(result.id).startswith("error_"):
+                result.id = f"eval_{index + 1}"
+                result.prompt = prompts[index].prompt
+        
+        response.headers["X-Cache-Hits"] = str(cache_hits)
+        
         # Calculate evaluation time
         evaluation_time = time.time() - start_time
         
@@ -243,17 +346,8 @@ async def evaluate_prompts(
         summary = generate_summary(results)
         summary.evaluation_time = evaluation_time
         
-        # Store results for potential export
-        evaluation_results_store[evaluation_id] = results
-        
-        # Update status
-        evaluation_status_store[evaluation_id].update({
-            "status": "completed",
-            "progress": len(results),
-            "percentage": 100.0,
-            "completed_at": datetime.utcnow().isoformat(),
-            "evaluation_time": evaluation_time
-        })
+        # Store results, cache entries and final status after the response is sent
+        background_tasks.add_task(finalize_evaluation, evaluation_id, results, summary, new_cache_entries)
         
         # Create response
         response = EvaluationResponse(
@@ -261,30 +355,28 @@ async def evaluate_prompts(
             message=f"Successfully evaluated {len(results)} prompts in {evaluation_time:.2f} seconds",
             results=results,
             total_evaluations=len(results),
-            summary=summary.dict()
+            summary=summary.model_dump(mode="json")
         )
         
-        logger.info(f"Completed evaluation {evaluation_id}: {len(results)} results, avg exact: {summary.average_exact_match:.1f}%, avg fuzzy: {summary.average_fuzzy_match:.1f}%")
-        
         return response
         
     except HTTPException:
         # Update status for HTTP errors
-        evaluation_status_store[evaluation_id] = {
+        await evaluation_store.set_status(evaluation_id, {
             "status": "failed",
             "error": "Validation or client error",
-            "failed_at": datetime.utcnow().isoformat()
-        }
+            "failed_at_ns": time.time_ns()
+        })
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in evaluation {evaluation_id}: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in evaluation %s: %s", evaluation_id, e, exc_info=True)
         
         # Update status for unexpected errors
-        evaluation_status_store[evaluation_id] = {
+        await evaluation_store.set_status(evaluation_id, {
             "status": "failed",
             "error": str(e),
-            "failed_at": datetime.utcnow().isoformat()
-        }
+            "failed_at_ns": time.time_ns()
+        })
         
         raise HTTPException(
             status_code=500,
@@ -292,9 +384,246 @@ async def evaluate_prompts(
         )
 
 
+def _results_to_soa(results: List[EvaluationResult]) -> Dict[str, np.ndarray]:
+    """
+    Convert results to one array per metric
+    
+    Reads every result once, appending all of its metrics to one flat list
+    that is converted to a 2-D array in a single call; the arrays returned are
+    its columns. Missing advanced metrics are stored as NaN.
+    """
+    nan = np.nan
+    missing_advanced = (nan,) * (1 + len(ROUGE_TYPES) + len(SEMANTIC_METHODS))
+    values = []
+    extend = values.extend
+    
+    for r in results:
+        security_flags = r.security_flags
+        extend((r.exact_match, r.fuzzy_match, r.toxicity, len(security_flags) if security_flags else 0))
+        
+        am = r.advanced_metrics
+        if am is None:
+            extend(missing_advanced)
+            continue
+        
+        rouge_scores = am.rouge_scores
+        semantic_similarity = am.semantic_similarity
+        extend((
+            am.bleu_score,
+            rouge_scores["rouge-1"]["f1"] if "rouge-1" in rouge_scores else nan,
+            rouge_scores["rouge-2"]["f1"] if "rouge-2" in rouge_scores else nan,
+            rouge_scores["rouge-l"]["f1"] if "rouge-l" in rouge_scores else nan,
+            semantic_similarity.get("tfidf", nan),
+            semantic_similarity.get("jaccard", nan),
+            semantic_similarity.get("sequence", nan)
+        ))
+    
+    columns = np.array(values, dtype=np.float64).reshape(len(results), -1).T
+    soa = {
+        "exact_match": columns[0],
+        "fuzzy_match": columns[1],
+        "toxicity": columns[2] != 0,
+        "n_security_flags": columns[3].astype(np.int32),
+        "bleu": columns[4],
+    }
+    for offset, key in enumerate(ROUGE_TYPES + SEMANTIC_METHODS, start=5):
+        soa[key] = columns[offset]
+    return soa
+
+
+def _nan_mean(values: np.ndarray) -> float:
+    """Mean of the non-NaN values, or 0.0 if there are none"""
+    valid = values[~np.isnan(values)]
+    return float(valid.mean()) if valid.size else 0.0
+
+
+def _score_range_counts(scores: np.ndarray) -> np.ndarray:
+    """Number of scores in each score range, binned like generate_summary"""
+    ranges = np.searchsorted(SCORE_RANGE_BOUNDS, scores, side="left")
+    return np.bincount(ranges, minlength=len(SCORE_RANGES))
+
+
+def generate_summary_vectorized(results: List[EvaluationResult]) -> EvaluationSummary:
+    """
+    Generate summary statistics using NumPy reductions
+    
+    Produces the same summary as generate_summary; used for large result sets
+    where array reductions outweigh the cost of building the arrays.
+    """
+    soa = _results_to_soa(results)
+    exact = soa["exact_match"]
+    fuzzy = soa["fuzzy_match"]
+    n_flags = soa["n_security_flags"]
+    
+    flagged_prompts = np.count_nonzero((exact < 50) | soa["toxicity"] | (n_flags > 0))
+    # Results only differ by their flag count, so score the counts instead of each result
+    flag_counts = np.bincount(
+        np.minimum(n_flags, len(SECURITY_SCORE_BY_FLAGS) - 1),
+        minlength=len(SECURITY_SCORE_BY_FLAGS)
+    )
+    security_score = (flag_counts @ SECURITY_SCORE_BY_FLAGS) / len(n_flags)
+    exact_counts = _score_range_counts(exact)
+    fuzzy_counts = _score_range_counts(fuzzy)
+    
+    advanced_metrics_summary = None
+    if not np.isnan(soa["bleu"]).all():
+        advanced_metrics_summary = AdvancedMetricsSummary(
+            average_bleu_score=_nan_mean(soa["bleu"]),
+            average_rouge_f1={rouge_type: _nan_mean(soa[rouge_type]) for rouge_type in ROUGE_TYPES},
+            average_semantic_similarity={method: _nan_mean(soa[method]) for method in SEMANTIC_METHODS}
+        )
+    
+    return EvaluationSummary(
+        total_prompts=len(results),
+        average_exact_match=float(exact.mean()),
+        average_fuzzy_match=float(fuzzy.mean()),
+        flagged_prompts=int(flagged_prompts),
+        security_score=float(security_score),
+        models_used=list({r.model for r in results}),
+        evaluation_time=0.0,  # Will be calculated by the endpoint
+        advanced_metrics_summary=advanced_metrics_summary,
+        score_distribution=generate_score_distribution(exact_counts, fuzzy_counts)
+    )
+
+
+def format_status(status: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Format a stored status for the API
+    
+    Timestamps are stored as integer nanoseconds (`*_at_ns`) and only turned
+    into ISO 8601 strings (`*_at`) here, when a status is actually requested.
+    """
+    formatted = {}
+    for key, value in status.items():
+        if key.endswith("_at_ns"):
+            formatted[key[:-3]] = datetime.fromtimestamp(value / 1e9, tz=timezone.utc).isoformat()
+        else:
+            formatted[key] = value
+    return formatted
+
+
+def format_sse(event: str, data: Any) -> bytes:
+    """Encode a server-sent event with a JSON payload"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.post(
+    "/evaluate/stream",
+    dependencies=[Depends(stream_evaluation_rate_limit)],
+    responses={
+        200: {"description": "Server-sent event stream", "content": {"text/event-stream": {}}},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+    },
+    summary="Run LLM evaluation with streamed results",
+    description="Evaluate prompts and stream each result as a server-sent event as soon as it is ready"
+)
+async def evaluate_prompts_stream(
+    request: Request,
+    evaluation_request: EvaluationRequest
+):
+    """
+    Evaluate prompts and stream results as server-sent events
+    
+    **Events:**
+    - `start`: evaluation ID and number of prompts
+    - `result`: one evaluation result (same shape as in `/evaluate`)
+    - `summary`: summary statistics once all prompts are done
+    - `error`: evaluation failed; no summary follows
+    
+    Results are also stored under the evaluation ID for later retrieval and export,
+    so clients do not need to poll `/evaluate/status/{evaluation_id}`.
+    """
+    start_time = time.time()
+    evaluation_id = f"eval_{int(time.time() * 1000)}"
+    total = len(evaluation_request.prompts)
+    
+    logger.info("Starting streamed evaluation %s with %d prompts using %s", evaluation_id, total, evaluation_request.model)
+    
+    await evaluation_store.set_status(evaluation_id, {
+        "status": "running",
+        "progress": 0,
+        "total": total,
+        "started_at_ns": time.time_ns()
+    })
+    
+    async def event_stream():
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def result_callback(result: EvaluationResult):
+            await queue.put(format_sse("result", result.model_dump(by_alias=True)))
+        
+        async def progress_callback(current: int, total: int, percentage: float):
+            await evaluation_store.update_status(
+                evaluation_id,
+                progress=current,
+                percentage=percentage
+            )
+        
+        async def run_evaluation():
+            try:
+                results = await evaluate_prompts_batch(
+                    evaluation_request.prompts,
+                    evaluation_request.model.value,
+                    evaluation_request.parameters,
+                    progress_callback=progress_callback,
+                    result_callback=result_callback
+                )
+                
+                summary = generate_summary(results)
+                summary.evaluation_time = time.time() - start_time
+                summary_data = summary.model_dump(mode="json")
+                
+                await evaluation_store.set_results(evaluation_id, results)
+                await evaluation_store.update_status(
+                    evaluation_id,
+                    status="completed",
+                    progress=len(results),
+                    percentage=100.0,
+                    completed_at_ns=time.time_ns(),
+                    evaluation_time=summary.evaluation_time,
+                    summary=summary_data
+                )
+                await queue.put(format_sse("summary", summary_data))
+            except asyncio.CancelledError:
+                # The client disconnected; record it so the status stops reporting "running"
+                logger.info("Streamed evaluation %s cancelled", evaluation_id)
+                await evaluation_store.update_status(
+                    evaluation_id,
+                    status="cancelled",
+                    cancelled_at_ns=time.time_ns()
+                )
+                raise
+            except Exception as e:
+                logger.error("Error in streamed evaluation %s: %s", evaluation_id, e, exc_info=True)
+                await evaluation_store.set_status(evaluation_id, {
+                    "status": "failed",
+                    "error": str(e),
+                    "failed_at_ns": time.time_ns()
+                })
+                await queue.put(format_sse("error", {"detail": "Internal server error during evaluation"}))
+            finally:
+                await queue.put(None)
+        
+        task = asyncio.create_task(run_evaluation())
+        try:
+            yield format_sse("start", {"evaluation_id": evaluation_id, "total": total})
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            # Stop the evaluation if the client disconnects early
+            task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post(
     "/evaluate/single",
     response_model=EvaluationResult,
+    dependencies=[Depends(single_evaluation_rate_limit)],
     responses={
         400: {"model": ErrorResponse, "description": "Bad request - validation error"},
         429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
@@ -303,7 +632,6 @@ async def evaluate_prompts(
     summary="Evaluate single prompt",
     description="Evaluate a single prompt against the selected model for quick testing"
 )
-@limiter.limit(f"{settings.rate_limit_per_minute}/minute")
 async def evaluate_single(
     request: Request,
     prompt: str,
@@ -319,7 +647,15 @@ async def evaluate_single(
     - Quick quality checks
     - Experimenting with different parameters
     """
-    logger.info(f"Single evaluation request for model {model}")
+    logger.info("Single evaluation request for model %s", model)
+    
+    prompt = prompt.strip()
+    expected_output = expected_output.strip()
+    if not prompt or not expected_output:
+        raise HTTPException(
+            status_code=400,
+            detail="Prompt and expected output cannot be empty"
+        )
     
     try:
         # Create prompt data
@@ -336,15 +672,15 @@ async def evaluate_single(
             f"single_{int(time.time() * 1000000)}"
         )
         
-        logger.info(f"Single evaluation completed: exact: {result.exact_match:.1f}%, fuzzy: {result.fuzzy_match:.1f}%")
+        logger.info("Single evaluation completed: exact: %.1f%%, fuzzy: %.1f%%", result.exact_match, result.fuzzy_match)
         
         return result
         
     except EvaluationError as e:
-        logger.error(f"Single evaluation error: {str(e)}")
+        logger.error("Single evaluation error: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error in single evaluation: {str(e)}")
+        logger.error("Unexpected error in single evaluation: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Internal server error during evaluation"
@@ -366,13 +702,14 @@ async def get_evaluation_status(evaluation_id: str):
     - Timestamps
     - Error information (if failed)
     """
-    if evaluation_id not in evaluation_status_store:
+    status = await evaluation_store.get_status(evaluation_id)
+    if status is None:
         raise HTTPException(
             status_code=404,
             detail="Evaluation not found"
         )
     
-    return evaluation_status_store[evaluation_id]
+    return format_status(status)
 
 
 @router.get(
@@ -388,13 +725,14 @@ async def get_evaluation_results(evaluation_id: str):
     This endpoint allows you to retrieve results from previous evaluations
     for analysis or export.
     """
-    if evaluation_id not in evaluation_results_store:
+    results = await evaluation_store.get_results(evaluation_id)
+    if results is None:
         raise HTTPException(
             status_code=404,
             detail="Evaluation results not found"
         )
     
-    return evaluation_results_store[evaluation_id]
+    return results
 
 
 @router.get(
@@ -403,34 +741,23 @@ async def get_evaluation_results(evaluation_id: str):
     summary="Get available models",
     description="Get list of available LLM models for evaluation"
 )
-async def get_available_models():
+async def get_available_models(request: Request):
     """
     Get information about available LLM models
     
     Returns details about supported models, their capabilities,
     and recommended use cases from all configured providers.
+    
+    The response carries an ETag; clients sending it back in If-None-Match
+    get an empty 304 response while the model list is unchanged.
     """
     from app.utils.providers import provider_manager
     
-    # Get all available models from all providers
-    models = provider_manager.get_all_models()
-    
-    # Convert to ModelInfo objects
-    model_infos = []
-    for model in models:
-        model_info = ModelInfo(
-            id=model.id,
-            name=model.name,
-            provider=model.provider,
-            max_tokens=model.max_tokens,
-            context_length=model.context_length,
-            description=model.description,
-            capabilities=model.capabilities,
-            is_available=True
-        )
-        model_infos.append(model_info)
+    payload, etag = provider_manager.get_models_json()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
     
-    return model_infos
+    return Response(content=payload, media_type="application/json", headers={"ETag": etag})
 
 
 @router.delete(
@@ -444,15 +771,7 @@ async def delete_evaluation_results(evaluation_id: str):
     
     This helps clean up memory and remove old evaluation data.
     """
-    deleted_items = []
-    
-    if evaluation_id in evaluation_results_store:
-        del evaluation_results_store[evaluation_id]
-        deleted_items.append("results")
-    
-    if evaluation_id in evaluation_status_store:
-        del evaluation_status_store[evaluation_id]
-        deleted_items.append("status")
+    deleted_items = await evaluation_store.delete(evaluation_id)
     
     if not deleted_items:
         raise HTTPException(
@@ -4,17 +4,19 @@ Supports CSV and JSON export formats with flexible data selection
 """
 
 import csv
-import json
-import io
-from typing import List, Optional, Dict, Any
+import zlib
+from functools import lru_cache
+from itertools import chain, islice
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Request, Query, Depends
-from fastapi.responses import StreamingResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from fastapi.responses import Response, StreamingResponse
 import logging
 
-from app.config import settings
+import orjson
+
+from app.config import Settings, get_settings
 from app.models import (
     ExportRequest,
     ExportResponse,
@@ -22,169 +24,308 @@ from app.models import (
     EvaluationResult,
     ErrorResponse
 )
+from app.utils.limiter import export_evaluation_rate_limit, export_rate_limit
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Rate limiter for export endpoints
-limiter = Limiter(key_func=get_remote_address)
+# Shared evaluation results store
+from app.utils.storage import evaluation_store
+
+# Largest number of results a single export may contain
+MAX_RESULTS_PER_EXPORT = 10000
+
+# Exports with fewer results are sent in one piece with a Content-Length
+# instead of being streamed with chunked encoding
+STREAMING_EXPORT_THRESHOLD = 500
+
+# Results encoded per orjson call (and per streamed chunk) in JSON exports
+JSON_EXPORT_BATCH_SIZE = 256
+
+# Standard CSV columns and model parameter columns, read in one C-level call each
+_BASE_COLUMNS = attrgetter(
+    "id", "prompt", "model_response", "expected_output", "exact_match",
+    "fuzzy_match", "toxicity", "model", "timestamp"
+)
+_PARAMETER_KEYS = ("temperature", "max_tokens", "top_p", "frequency_penalty")
+_PARAMETER_COLUMNS = attrgetter(*_PARAMETER_KEYS)
+
+# Export summary of the last seen store version
+_summary_cache: Dict[str, Any] = {"version": None, "value": None}
+
+
+class _BytesWriter:
+    """
+    File-like object whose write() returns the data UTF-8 encoded
+    
+    csv.writer.writerow() returns whatever write() returns, so each row
+    comes back as bytes that can be yielded directly.
+    """
+    
+    def write(self, value: str) -> bytes:
+        return value.encode('utf-8')
+
+
+def _check_export_size(total_results: int) -> None:
+    """
+    Reject exports above MAX_RESULTS_PER_EXPORT before any content is generated
+    
+    Raises:
+        HTTPException: 413 if there are too many results
+    """
+    if total_results > MAX_RESULTS_PER_EXPORT:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Too many results to export ({total_results}). "
+                f"Maximum per export: {MAX_RESULTS_PER_EXPORT}"
+            )
+        )
+
+
+def _export_response(
+    content: Iterator[bytes],
+    total_results: int,
+    filename: str,
+    media_type: str,
+    headers: Dict[str, str]
+) -> Response:
+    """
+    Response for generated export content
+    
+    Small exports are built in memory so the response carries a Content-Length
+    (letting clients show download progress) and any error becomes a 500;
+    larger ones are streamed to the client as they are generated.
+    """
+    if total_results < STREAMING_EXPORT_THRESHOLD:
+        return Response(content=b"".join(content), media_type=media_type, headers=headers)
+    return StreamingResponse(_abort_on_error(content, filename), media_type=media_type, headers=headers)
+
 
-# Import the results store from evaluation router
-# In a real application, this would be a database
-from app.routers.evaluation import evaluation_results_store
+def _abort_on_error(content: Iterator[bytes], filename: str) -> Iterator[bytes]:
+    """
+    Pass streamed export content through, logging any error raised while generating it
+    
+    The 200 status has already been sent by then, so the error is re-raised to
+    abort the connection before the final chunk: clients see an incomplete
+    transfer instead of a well-formed but truncated file.
+    """
+    try:
+        yield from content
+    except Exception:
+        logger.error("Export %s failed while streaming, aborting the response", filename, exc_info=True)
+        raise
 
 
-def generate_csv_content(results: List[EvaluationResult], include_metadata: bool = True) -> str:
+def _peek_results(results: Iterable[EvaluationResult]) -> Optional[Iterator[EvaluationResult]]:
     """
-    Generate CSV content from evaluation results
+    Check whether there are any results without materializing them
+    
+    Returns:
+        Iterator over all the results, or None if there are none
+    """
+    iterator = iter(results)
+    first = next(iterator, None)
+    if first is None:
+        return None
+    return chain((first,), iterator)
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Compress a stream of chunks into one gzip stream on the fly
     
     Args:
-        results: List of evaluation results
+        chunks: Uncompressed chunks
+        level: Compression level (1-9)
+        
+    Yields:
+        Compressed chunks, skipping the empty ones the compressor returns
+        while it buffers input
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _csv_encode(row: List[Any]) -> bytes:
+    """Encode a single CSV row"""
+    return csv.writer(_BytesWriter()).writerow(row)
+
+
+# Header rows, encoded once
+_CSV_COLUMNS = [
+    "ID",
+    "Prompt",
+    "Model Response",
+    "Expected Output",
+    "Exact Match (%)",
+    "Fuzzy Match (%)",
+    "Toxicity",
+    "Model",
+    "Timestamp"
+]
+_CSV_METADATA_COLUMNS = [
+    "Security Flags",
+    "Temperature",
+    "Max Tokens",
+    "Top P",
+    "Frequency Penalty"
+]
+_CSV_HEADER = _csv_encode(_CSV_COLUMNS)
+_CSV_HEADER_WITH_METADATA = _csv_encode(_CSV_COLUMNS + _CSV_METADATA_COLUMNS)
+
+
+def _csv_row(result: EvaluationResult) -> List[Any]:
+    """CSV row with the standard columns"""
+    row = list(_BASE_COLUMNS(result))
+    row[6] = "Yes" if row[6] else "No"  # Toxicity
+    return row
+
+
+def _csv_row_with_metadata(result: EvaluationResult) -> List[Any]:
+    """CSV row with the standard columns followed by the metadata columns"""
+    row = _csv_row(result)
+    
+    # Security flags
+    row.append(", ".join(result.security_flags) if result.security_flags else "None")
+    
+    # Model parameters
+    parameters = result.parameters
+    if parameters is not None:
+        row.extend(_PARAMETER_COLUMNS(parameters))
+    else:
+        row.extend(["N/A", "N/A", "N/A", "N/A"])
+    return row
+
+
+def _json_row(result: EvaluationResult) -> Dict[str, Any]:
+    """JSON object with the standard fields"""
+    return {
+        "id": result.id,
+        "prompt": result.prompt,
+        "model_response": result.model_response,
+        "expected_output": result.expected_output,
+        "exact_match": result.exact_match,
+        "fuzzy_match": result.fuzzy_match,
+        "toxicity": result.toxicity,
+        "model": result.model,
+        "timestamp": result.timestamp
+    }
+
+
+def _json_row_with_metadata(result: EvaluationResult) -> Dict[str, Any]:
+    """JSON object with the standard fields plus security flags and parameters when set"""
+    result_dict = _json_row(result)
+    
+    if result.security_flags:
+        result_dict["security_flags"] = result.security_flags
+    
+    parameters = result.parameters
+    if parameters is not None:
+        result_dict["parameters"] = dict(zip(_PARAMETER_KEYS, _PARAMETER_COLUMNS(parameters)))
+    return result_dict
+
+
+def iter_csv_rows(results: Iterable[EvaluationResult], include_metadata: bool = True) -> Iterator[bytes]:
+    """
+    Generate CSV content from evaluation results, one row at a time
+    
+    Args:
+        results: Evaluation results (a list or any iterable)
         include_metadata: Whether to include metadata columns
         
-    Returns:
-        CSV content as string
+    Yields:
+        UTF-8 encoded CSV lines, starting with the header
     """
-    if not results:
-        return "No data available"
-    
-    # Define standard columns
-    columns = [
-        "ID",
-        "Prompt",
-        "Model Response",
-        "Expected Output",
-        "Exact Match (%)",
-        "Fuzzy Match (%)",
-        "Toxicity",
-        "Model",
-        "Timestamp"
-    ]
-    
-    if include_metadata:
-        columns.extend([
-            "Security Flags",
-            "Temperature",
-            "Max Tokens",
-            "Top P",
-            "Frequency Penalty"
-        ])
-    
-    # Create CSV content
-    output = io.StringIO()
-    writer = csv.writer(output)
+    results = _peek_results(results)
+    if results is None:
+        yield b"No data available"
+        return
+    
+    writer = csv.writer(_BytesWriter())
     
     # Write header
-    writer.writerow(columns)
+    yield _CSV_HEADER_WITH_METADATA if include_metadata else _CSV_HEADER
+    
+    # Pick the row builder once instead of branching on every row
+    build_row = _csv_row_with_metadata if include_metadata else _csv_row
     
     # Write data rows
     for result in results:
-        row = [
-            result.id,
-            result.prompt,
-            result.model_response,
-            result.expected_output,
-            result.exact_match,
-            result.fuzzy_match,
-            "Yes" if result.toxicity else "No",
-            result.model,
-            result.timestamp
-        ]
-        
-        if include_metadata:
-            # Security flags
-            security_flags = ", ".join(result.security_flags) if result.security_flags else "None"
-            row.append(security_flags)
-            
-            # Model parameters
-            if result.parameters:
-                row.extend([
-                    result.parameters.temperature,
-                    result.parameters.max_tokens,
-                    result.parameters.top_p,
-                    result.parameters.frequency_penalty
-                ])
-            else:
-                row.extend(["N/A", "N/A", "N/A", "N/A"])
-        
-        writer.writerow(row)
-    
-    return output.getvalue()
+        yield writer.writerow(build_row(result))
 
 
-def generate_json_content(results: List[EvaluationResult], include_metadata: bool = True) -> str:
+def iter_json_rows(
+    results: Iterable[EvaluationResult],
+    include_metadata: bool = True,
+    total_results: Optional[int] = None
+) -> Iterator[bytes]:
     """
-    Generate JSON content from evaluation results
+    Generate JSON content from evaluation results, a batch at a time
+    
+    The document is written incrementally: the export metadata first, then
+    the "results" array in batches of JSON_EXPORT_BATCH_SIZE results, each
+    encoded with one orjson call and written on its own line, so the whole
+    export never has to be held in memory.
     
     Args:
-        results: List of evaluation results
+        results: Evaluation results (a list or any iterable)
         include_metadata: Whether to include metadata
+        total_results: Number of results, required when results has no len()
         
-    Returns:
-        JSON content as string
+    Yields:
+        UTF-8 encoded chunks of one JSON document
     """
-    if not results:
-        return json.dumps({"results": [], "message": "No data available"})
+    if total_results is None:
+        total_results = len(results)
     
-    # Convert results to dictionaries
-    json_results = []
-    for result in results:
-        result_dict = {
-            "id": result.id,
-            "prompt": result.prompt,
-            "model_response": result.model_response,
-            "expected_output": result.expected_output,
-            "exact_match": result.exact_match,
-            "fuzzy_match": result.fuzzy_match,
-            "toxicity": result.toxicity,
-            "model": result.model,
-            "timestamp": result.timestamp
-        }
-        
-        if include_metadata:
-            if result.security_flags:
-                result_dict["security_flags"] = result.security_flags
-            
-            if result.parameters:
-                result_dict["parameters"] = {
-                    "temperature": result.parameters.temperature,
-                    "max_tokens": result.parameters.max_tokens,
-                    "top_p": result.parameters.top_p,
-                    "frequency_penalty": result.parameters.frequency_penalty
-                }
-        
-        json_results.append(result_dict)
+    results = _peek_results(results)
+    if results is None:
+        yield orjson.dumps({"results": [], "message": "No data available"})
+        return
     
     # Create export metadata
-    export_data = {
-        "export_info": {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "total_results": len(results),
-            "format": "json",
-            "include_metadata": include_metadata
-        },
-        "results": json_results
+    export_info = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "total_results": total_results,
+        "format": "json",
+        "include_metadata": include_metadata
     }
+    yield b'{"export_info":' + orjson.dumps(export_info) + b',"results":[\n'
     
-    return json.dumps(export_data, indent=2, default=str)
+    build_row = _json_row_with_metadata if include_metadata else _json_row
+    
+    separator = b""
+    while batch := [build_row(result) for result in islice(results, JSON_EXPORT_BATCH_SIZE)]:
+        # Strip the brackets so the batches join into one array
+        yield separator + orjson.dumps(batch, default=str)[1:-1]
+        separator = b",\n"
+    
+    yield b"\n]}\n"
 
 
 @router.post(
     "/export",
+    dependencies=[Depends(export_rate_limit)],
     responses={
         200: {"description": "File download", "content": {"application/octet-stream": {}}},
         400: {"model": ErrorResponse, "description": "Bad request - validation error"},
         404: {"model": ErrorResponse, "description": "No data to export"},
+        413: {"model": ErrorResponse, "description": "Too many results to export"},
         429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
     summary="Export evaluation results",
     description="Export evaluation results to CSV or JSON format for download"
 )
-@limiter.limit(f"{settings.rate_limit_per_minute}/minute")
 async def export_results(
     request: Request,
-    export_request: ExportRequest
+    export_request: ExportRequest,
+    gzip: bool = Query(False, description="Compress the download with gzip")
 ):
     """
     Export evaluation results to the specified format
@@ -196,6 +337,7 @@ async def export_results(
     **Options:**
     - Include/exclude metadata (parameters, security flags)
     - Export specific results or all available results
+    - Compress the download with gzip (`?gzip=true`)
     
     **CSV format includes:**
     - All evaluation metrics and scores
@@ -215,50 +357,48 @@ async def export_results(
         if export_request.results:
             # Export specific results provided in request
             results = export_request.results
-            logger.info(f"Exporting {len(results)} specific results")
+            total_results = len(results)
+            _check_export_size(total_results)
+            logger.info(f"Exporting {total_results} specific results")
         else:
-            # Export all available results from store
-            all_results = []
-            for evaluation_results in evaluation_results_store.values():
-                all_results.extend(evaluation_results)
+            # Export all available results from store, chaining the stored
+            # lists instead of copying them into one
+            stored_results = await evaluation_store.get_all_results()
+            results = _peek_results(chain.from_iterable(stored_results.values()))
             
-            if not all_results:
+            if results is None:
                 raise HTTPException(
                     status_code=404,
                     detail="No evaluation results available for export"
                 )
             
-            results = all_results
-            logger.info(f"Exporting all {len(results)} available results")
+            total_results = sum(map(len, stored_results.values()))
+            _check_export_size(total_results)
+            logger.info(f"Exporting all {total_results} available results")
         
         # Generate content based on format
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         
         if export_request.format == ExportFormat.CSV:
-            content = generate_csv_content(results, export_request.include_metadata)
+            content = iter_csv_rows(results, export_request.include_metadata)
             filename = f"llm_evaluation_results_{timestamp}.csv"
             media_type = "text/csv"
         else:  # JSON
-            content = generate_json_content(results, export_request.include_metadata)
+            content = iter_json_rows(results, export_request.include_metadata, total_results)
             filename = f"llm_evaluation_results_{timestamp}.json"
             media_type = "application/json"
         
-        # Create streaming response for download
-        def iter_content():
-            yield content.encode('utf-8')
-        
         headers = {
             "Content-Disposition": f"attachment; filename={filename}",
             "Content-Type": media_type,
         }
+        if gzip:
+            content = iter_gzip(content)
+            headers["Content-Encoding"] = "gzip"
         
-        logger.info(f"Generated export file: {filename} ({len(content)} bytes)")
+        logger.info(f"Generated export file: {filename} ({total_results} results)")
         
-        return StreamingResponse(
-            iter_content(),
-            media_type=media_type,
-            headers=headers
-        )
+        return _export_response(content, total_results, filename, media_type, headers)
         
     except HTTPException:
         raise
@@ -270,86 +410,27 @@ async def export_results(
         )
 
 
-@router.get(
-    "/export/{evaluation_id}",
-    responses={
-        200: {"description": "File download", "content": {"application/octet-stream": {}}},
-        404: {"model": ErrorResponse, "description": "Evaluation not found"},
-        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
-    },
-    summary="Export specific evaluation results",
-    description="Export results from a specific evaluation by ID"
-)
-@limiter.limit(f"{settings.rate_limit_per_minute}/minute")
-async def export_evaluation_results(
-    request: Request,
-    evaluation_id: str,
-    format: ExportFormat = Query(ExportFormat.CSV, description="Export format"),
-    include_metadata: bool = Query(True, description="Include metadata in export")
-):
-    """
-    Export results from a specific evaluation
-    
-    This endpoint allows you to export results from a particular evaluation
-    session by providing the evaluation ID.
-    """
-    logger.info(f"Export request for evaluation {evaluation_id}: format={format}")
-    
-    if evaluation_id not in evaluation_results_store:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Evaluation {evaluation_id} not found"
-        )
-    
-    results = evaluation_results_store[evaluation_id]
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    
-    try:
-        if format == ExportFormat.CSV:
-            content = generate_csv_content(results, include_metadata)
-            filename = f"evaluation_{evaluation_id}_{timestamp}.csv"
-            media_type = "text/csv"
-        else:  # JSON
-            content = generate_json_content(results, include_metadata)
-            filename = f"evaluation_{evaluation_id}_{timestamp}.json"
-            media_type = "application/json"
-        
-        def iter_content():
-            yield content.encode('utf-8')
-        
-        headers = {
-            "Content-Disposition": f"attachment; filename={filename}",
-            "Content-Type": media_type,
-        }
-        
-        logger.info(f"Exported evaluation {evaluation_id}: {filename} ({len(content)} bytes)")
-        
-        return StreamingResponse(
-            iter_content(),
-            media_type=media_type,
-            headers=headers
-        )
-        
-    except Exception as e:
-        logger.error(f"Export error for evaluation {evaluation_id}: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail="Internal server error during export"
-        )
-
-
 @router.get(
     "/export/formats",
     summary="Get supported export formats",
     description="Get information about supported export formats and their features"
 )
-async def get_export_formats():
+async def get_export_formats(app_settings: Settings = Depends(get_settings)):
     """
     Get information about supported export formats
     
     Returns details about available formats, their features, and use cases.
     """
-    return {
+    return Response(
+        content=_export_formats_json(app_settings.rate_limit_per_minute),
+        media_type="application/json"
+    )
+
+
+@lru_cache(maxsize=8)
+def _export_formats_json(rate_limit_per_minute: int) -> bytes:
+    """Encoded export formats payload, built once per configured rate limit"""
+    return orjson.dumps({
         "formats": [
             {
                 "id": "csv",
@@ -394,10 +475,10 @@ async def get_export_formats():
             }
         },
         "limits": {
-            "max_results_per_export": 10000,
-            "rate_limit_per_minute": settings.rate_limit_per_minute
+            "max_results_per_export": MAX_RESULTS_PER_EXPORT,
+            "rate_limit_per_minute": rate_limit_per_minute
         }
-    }
+    })
 
 
 @router.get(
@@ -414,14 +495,33 @@ async def get_export_summary():
     - Number of evaluations
     - Date ranges
     - Models evaluated
+    
+    The summary is cached until the stored results change.
     """
-    all_results = []
-    evaluations_count = len(evaluation_results_store)
+    version = evaluation_store.results_version
+    if version is not None and _summary_cache["version"] == version:
+        return _summary_cache["value"]
     
-    for evaluation_results in evaluation_results_store.values():
-        all_results.extend(evaluation_results)
+    summary = compute_export_summary(await evaluation_store.get_all_results())
+    if version is not None:
+        _summary_cache["version"] = version
+        _summary_cache["value"] = summary
+    return summary
+
+
+def compute_export_summary(evaluation_results_by_id: Dict[str, List[EvaluationResult]]) -> Dict[str, Any]:
+    """
+    Summarize all stored results
     
-    if not all_results:
+    Args:
+        evaluation_results_by_id: Stored results keyed by evaluation ID
+        
+    Returns:
+        Export summary
+    """
+    # The count only needs the length of each stored list
+    total_results = sum(map(len, evaluation_results_by_id.values()))
+    if not total_results:
         return {
             "total_results": 0,
             "total_evaluations": 0,
@@ -430,29 +530,111 @@ async def get_export_summary():
             "summary": "No data available for export"
         }
     
-    # Calculate summary statistics
-    timestamps = [result.timestamp for result in all_results]
-    models = list(set(result.model for result in all_results))
+    flagged_results = toxic_results = 0
+    sum_exact = sum_fuzzy = 0.0
+    models = set()
+    add_model = models.add
+    earliest = latest = None
     
-    # Find date range
-    sorted_timestamps = sorted(timestamps)
-    earliest = sorted_timestamps[0] if sorted_timestamps else None
-    latest = sorted_timestamps[-1] if sorted_timestamps else None
+    for evaluation_results in evaluation_results_by_id.values():
+        for result in evaluation_results:
+            sum_exact += result.exact_match
+            sum_fuzzy += result.fuzzy_match
+            add_model(result.model)
+            
+            timestamp = result.timestamp
+            if earliest is None or timestamp < earliest:
+                earliest = timestamp
+            if latest is None or timestamp > latest:
+                latest = timestamp
+            
+            if result.security_flags:
+                flagged_results += 1
+            if result.toxicity:
+                toxic_results += 1
     
     return {
-        "total_results": len(all_results),
-        "total_evaluations": evaluations_count,
+        "total_results": total_results,
+        "total_evaluations": len(evaluation_results_by_id),
         "date_range": {
             "earliest": earliest,
             "latest": latest
         } if earliest and latest else None,
-        "models": models,
+        "models": list(models),
         "average_scores": {
-            "exact_match": sum(r.exact_match for r in all_results) / len(all_results),
-            "fuzzy_match": sum(r.fuzzy_match for r in all_results) / len(all_results)
+            "exact_match": sum_exact / total_results,
+            "fuzzy_match": sum_fuzzy / total_results
         },
         "security_analysis": {
-            "flagged_results": len([r for r in all_results if r.security_flags]),
-            "toxic_results": len([r for r in all_results if r.toxicity])
+            "flagged_results": flagged_results,
+            "toxic_results": toxic_results
         }
-    } 
\ No newline at end of file
+    }
+
+
+# Registered after the fixed /export/... paths, which it would otherwise shadow
+@router.get(
+    "/export/{evaluation_id}",
+    dependencies=[Depends(export_evaluation_rate_limit)],
+    responses={
+        200: {"description": "File download", "content": {"application/octet-stream": {}}},
+        404: {"model": ErrorResponse, "description": "Evaluation not found"},
+        413: {"model": ErrorResponse, "description": "Too many results to export"},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+    },
+    summary="Export specific evaluation results",
+    description="Export results from a specific evaluation by ID"
+)
+async def export_evaluation_results(
+    request: Request,
+    evaluation_id: str,
+    format: ExportFormat = Query(ExportFormat.CSV, description="Export format"),
+    include_metadata: bool = Query(True, description="Include metadata in export"),
+    gzip: bool = Query(False, description="Compress the download with gzip")
+):
+    """
+    Export results from a specific evaluation
+    
+    This endpoint allows you to export results from a particular evaluation
+    session by providing the evaluation ID.
+    """
+    logger.info(f"Export request for evaluation {evaluation_id}: format={format}")
+    
+    results = await evaluation_store.get_results(evaluation_id)
+    if results is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Evaluation {evaluation_id} not found"
+        )
+    _check_export_size(len(results))
+    
+    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    
+    try:
+        if format == ExportFormat.CSV:
+            content = iter_csv_rows(results, include_metadata)
+            filename = f"evaluation_{evaluation_id}_{timestamp}.csv"
+            media_type = "text/csv"
+        else:  # JSON
+            content = iter_json_rows(results, include_metadata)
+            filename = f"evaluation_{evaluation_id}_{timestamp}.json"
+            media_type = "application/json"
+        
+        headers = {
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Type": media_type,
+        }
+        if gzip:
+            content = iter_gzip(content)
+            headers["Content-Encoding"] = "gzip"
+        
+        logger.info(f"Exported evaluation {evaluation_id}: {filename} ({len(results)} results)")
+        
+        return _export_response(content, len(results), filename, media_type, headers)
+        
+    except Exception as e:
+        logger.error(f"Export error for evaluation {evaluation_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error during export"
+        )
@@ -4,29 +4,47 @@ Supports CSV and JSONL files with validation and parsing
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from pydantic import TypeAdapter, ValidationError
 import logging
-from typing import List
+from typing import AsyncIterator, List
 
-from app.config import settings
+from app.config import Settings, get_settings
 from app.models import UploadResponse, PromptData, ErrorResponse
 from app.utils.file_processing import (
     validate_file_size,
     validate_file_type,
     process_uploaded_file
 )
+from app.utils.limiter import upload_rate_limit
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Rate limiter for upload endpoint
-limiter = Limiter(key_func=get_remote_address)
+# Validates a whole parsed dataset in one pydantic-core call
+_PROMPT_LIST_ADAPTER = TypeAdapter(List[PromptData])
+
+# Size of each read from the uploaded file
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+async def _iter_upload(file: UploadFile, max_bytes: int) -> AsyncIterator[bytes]:
+    """
+    Read an uploaded file in chunks
+    
+    Raises:
+        HTTPException: 413 as soon as more than max_bytes have been read
+    """
+    total = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        validate_file_size(total, max_bytes)
+        yield chunk
 
 
 @router.post(
     "/upload",
     response_model=UploadResponse,
+    dependencies=[Depends(upload_rate_limit)],
     responses={
         400: {"model": ErrorResponse, "description": "Bad request - validation error"},
         413: {"model": ErrorResponse, "description": "File too large"},
@@ -36,14 +54,14 @@ limiter = Limiter(key_func=get_remote_address)
     summary="Upload dataset file",
     description="Upload a CSV or JSONL file containing prompts and expected outputs for evaluation"
 )
-@limiter.limit(f"{settings.rate_limit_per_minute}/minute")
 async def upload_dataset(
     request: Request,
     file: UploadFile = File(
         ...,
         description="CSV or JSONL file containing prompts and expected outputs",
         example="dataset.csv"
-    )
+    ),
+    app_settings: Settings = Depends(get_settings)
 ):
     """
     Upload and parse a dataset file for LLM evaluation
@@ -84,33 +102,23 @@ async def upload_dataset(
                 detail="Filename is required"
             )
         
-        validate_file_type(file.filename, settings.ALLOWED_FILE_TYPES)
-        
-        # Read file content
-        content = await file.read()
+        validate_file_type(file.filename, app_settings.ALLOWED_FILE_TYPES)
         
-        # Validate file size
-        validate_file_size(len(content), settings.MAX_FILE_SIZE_BYTES)
+        # Read the file in chunks, stopping early if it is too large
+        content = [chunk async for chunk in _iter_upload(file, app_settings.MAX_FILE_SIZE_BYTES)]
         
         # Process the file
         processed_data, warnings = process_uploaded_file(content, file.filename)
         
-        # Convert to PromptData objects for validation
-        prompt_objects = []
-        for item in processed_data:
-            try:
-                prompt_obj = PromptData(
-                    prompt=item["prompt"],
-                    expected_output=item["expected_output"],
-                    metadata=item.get("metadata")
-                )
-                prompt_objects.append(prompt_obj)
-            except Exception as e:
-                logger.error(f"Failed to create PromptData object: {e}")
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid data format: {str(e)}"
-                )
+        # Validate all rows as PromptData objects in one pass
+        try:
+            prompt_objects = _PROMPT_LIST_ADAPTER.validate_python(processed_data)
+        except ValidationError as e:
+            logger.error("Invalid data in %s: %d validation errors", file.filename, e.error_count())
+            raise HTTPException(
+                status_code=400,
+                detail=e.errors(include_url=False, include_context=False)[:5]
+            )
         
         # Create preview (first 5 items)
         preview = prompt_objects[:5]
@@ -151,7 +159,7 @@ async def upload_dataset(
     summary="Get upload requirements",
     description="Get information about file upload requirements and supported formats"
 )
-async def get_upload_info():
+async def get_upload_info(app_settings: Settings = Depends(get_settings)):
     """
     Get information about file upload requirements
     
@@ -162,9 +170,9 @@ async def get_upload_info():
     - Example formats
     """
     return {
-        "supported_formats": settings.ALLOWED_FILE_TYPES,
-        "max_file_size_mb": settings.max_file_size_mb,
-        "max_file_size_bytes": settings.MAX_FILE_SIZE_BYTES,
+        "supported_formats": app_settings.ALLOWED_FILE_TYPES,
+        "max_file_size_mb": app_settings.max_file_size_mb,
+        "max_file_size_bytes": app_settings.MAX_FILE_SIZE_BYTES,
         "required_columns": {
             "prompt_fields": ["prompt", "question", "input", "query"],
             "expected_output_fields": ["expected_output", "expected", "answer", "output", "target", "ground_truth"]
@@ -16,7 +16,8 @@ from .advanced_metrics import (
     calculate_bleu_score,
     calculate_rouge_score,
     calculate_semantic_similarity,
-    calculate_advanced_metrics
+    calculate_advanced_metrics,
+    calculate_advanced_metrics_async
 )
 from .providers import (
     provider_manager,
@@ -45,6 +46,7 @@ __all__ = [
     "calculate_rouge_score",
     "calculate_semantic_similarity",
     "calculate_advanced_metrics",
+    "calculate_advanced_metrics_async",
     "provider_manager",
     "OpenAIProvider",
     "AnthropicProvider",
@@ -3,12 +3,19 @@ Advanced evaluation metrics for LLM performance assessment
 Includes BLEU, ROUGE, and semantic similarity calculations
 """
 
+import asyncio
+import os
 import re
 import math
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Callable, FrozenSet, Hashable, Iterable, Iterator, Tuple, Optional, Sequence
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
 import logging
-from difflib import SequenceMatcher
+
+import numpy as np
+from rapidfuzz.distance import Indel
 
 try:
     import nltk
@@ -20,16 +27,57 @@ except ImportError:
     logging.warning("NLTK not available. BLEU and ROUGE metrics will use fallback implementations.")
 
 try:
-    import numpy as np
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
+    from scipy.sparse import csr_matrix
+    from sklearn.feature_extraction.text import HashingVectorizer
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
     logging.warning("scikit-learn not available. Semantic similarity will use fallback implementation.")
 
+# Optional JIT compilation for the ROUGE-L LCS kernel
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Smoothing for sentence-level BLEU, created once instead of per call
+_BLEU_SMOOTHING = SmoothingFunction().method1 if NLTK_AVAILABLE else None
+
+_ZERO_SCORES = {"precision": 0.0, "recall": 0.0, "f1": 0.0}
+_PERFECT_SCORES = {"precision": 1.0, "recall": 1.0, "f1": 1.0}
+
+# Tokenize ASCII text with a precompiled regex instead of NLTK's word_tokenize
+# (set to False to always use NLTK)
+FAST_ASCII_TOKENIZER = True
+_FAST_TOKEN_RE = re.compile(r"\w+(?:'[A-Za-z]+)?|[^\w\s]", re.ASCII)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Worker threads that compute metrics off the event loop
+_METRIC_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="metrics")
+
+# Shortest token list for which n-grams (n >= 2) are matched on hashed IDs with
+# numpy; below this, building Counters is faster
+_HASHED_NGRAM_MIN_TOKENS = 256
+
+# Stateless term counter for TF-IDF similarity: no fitting and no vocabulary,
+# so any number of pairs are vectorized in one call
+_HASHING_VECTORIZER = HashingVectorizer(
+    lowercase=True,
+    stop_words='english',
+    ngram_range=(1, 2),
+    n_features=2 ** 18,
+    alternate_sign=False,
+    norm=None
+) if SKLEARN_AVAILABLE else None
+
+# Smoothed IDF of a term found in one of the two texts of a pair
+# (ln((1 + 2) / (1 + 1)) + 1); terms found in both have an IDF of 1
+_PAIR_IDF_ONE_TEXT = math.log(1.5) + 1
+
 
 def download_nltk_data():
     """Download required NLTK data for BLEU and ROUGE calculations"""
@@ -58,11 +106,8 @@ def preprocess_text(text: str) -> str:
     if not text:
         return ""
     
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    # Convert to lowercase and collapse whitespace
+    text = _WHITESPACE_RE.sub(' ', text.lower())
     
     # Remove punctuation (optional - can be configurable)
     # text = re.sub(r'[^\w\s]', '', text)
@@ -80,18 +125,34 @@ def tokenize_text(text: str) -> List[str]:
     Returns:
         List of tokens
     """
+    return list(_tokenize(text))
+
+
+@lru_cache(maxsize=4096)
+def _tokenize(text: str) -> Tuple[str, ...]:
+    """
+    Tokenize text into words, memoized
+    
+    Expected outputs are often shared by many prompts in a batch and every
+    text is scored by several metrics, so repeated texts are tokenized once.
+    The tokens are returned as a tuple so the cached value cannot be modified.
+    """
     if not text:
-        return []
+        return ()
+    
+    if FAST_ASCII_TOKENIZER and text.isascii():
+        # Words (keeping contractions whole) and individual punctuation marks
+        return tuple(_FAST_TOKEN_RE.findall(text.lower()))
     
     if NLTK_AVAILABLE:
         try:
-            return word_tokenize(preprocess_text(text))
+            return tuple(word_tokenize(preprocess_text(text)))
         except Exception:
             # Fallback to simple tokenization
             pass
     
     # Simple tokenization fallback
-    return preprocess_text(text).split()
+    return tuple(preprocess_text(text).split())
 
 
 def calculate_bleu_score(reference: str, candidate: str, weights: Tuple[float, ...] = (0.25, 0.25, 0.25, 0.25)) -> float:
@@ -110,27 +171,36 @@ def calculate_bleu_score(reference: str, candidate: str, weights: Tuple[float, .
         return 0.0
     
     try:
-        # Tokenize texts
-        reference_tokens = tokenize_text(reference)
-        candidate_tokens = tokenize_text(candidate)
-        
-        if not reference_tokens or not candidate_tokens:
-            return 0.0
-        
-        if NLTK_AVAILABLE:
-            # Use NLTK's BLEU implementation
-            smoothing = SmoothingFunction().method1
-            score = sentence_bleu([reference_tokens], candidate_tokens, weights=weights, smoothing_function=smoothing)
-            return float(score)
-        else:
-            # Fallback BLEU implementation
-            return _calculate_bleu_fallback(reference_tokens, candidate_tokens, weights)
-            
+        return _calculate_bleu_tokens(_tokenize(reference), _tokenize(candidate), weights)
     except Exception as e:
         logger.error(f"Error calculating BLEU score: {e}")
         return 0.0
 
 
+def _calculate_bleu_tokens(reference_tokens: List[str], candidate_tokens: List[str], weights: Tuple[float, ...]) -> float:
+    """
+    Calculate BLEU score for already tokenized texts
+    
+    Args:
+        reference_tokens: Tokenized reference text
+        candidate_tokens: Tokenized candidate text
+        weights: N-gram weights
+        
+    Returns:
+        BLEU score
+    """
+    if not reference_tokens or not candidate_tokens:
+        return 0.0
+    
+    if NLTK_AVAILABLE:
+        # Use NLTK's BLEU implementation
+        score = sentence_bleu([reference_tokens], candidate_tokens, weights=weights, smoothing_function=_BLEU_SMOOTHING)
+        return float(score)
+    
+    # Fallback BLEU implementation
+    return _calculate_bleu_fallback(reference_tokens, candidate_tokens, weights)
+
+
 def _calculate_bleu_fallback(reference_tokens: List[str], candidate_tokens: List[str], weights: Tuple[float, ...]) -> float:
     """
     Fallback BLEU implementation without NLTK
@@ -146,29 +216,16 @@ def _calculate_bleu_fallback(reference_tokens: List[str], candidate_tokens: List
     if not reference_tokens or not candidate_tokens:
         return 0.0
     
-    # Calculate n-gram precisions
+    # Calculate clipped n-gram precisions
     precisions = []
+    append_precision = precisions.append
     for n in range(1, len(weights) + 1):
-        if len(candidate_tokens) < n:
-            precisions.append(0.0)
-            continue
-        
-        # Get n-grams
-        candidate_ngrams = list(zip(*[candidate_tokens[i:] for i in range(n)]))
-        reference_ngrams = list(zip(*[reference_tokens[i:] for i in range(n)]))
-        
-        if not candidate_ngrams:
-            precisions.append(0.0)
+        total = len(candidate_tokens) - n + 1
+        if total <= 0:
+            append_precision(0.0)
             continue
         
-        # Count matches
-        matches = 0
-        for ngram in candidate_ngrams:
-            if ngram in reference_ngrams:
-                matches += 1
-        
-        precision = matches / len(candidate_ngrams) if candidate_ngrams else 0.0
-        precisions.append(precision)
+        append_precision(_count_ngram_matches(candidate_tokens, reference_tokens, n) / total)
     
     # Calculate geometric mean of precisions
     if not precisions or all(p == 0 for p in precisions):
@@ -186,6 +243,59 @@ def _calculate_bleu_fallback(reference_tokens: List[str], candidate_tokens: List
     return bp * math.exp(avg_log_precision)
 
 
+def _token_ids(*token_lists: Sequence[Hashable]) -> List[List[int]]:
+    """Map the tokens of several token lists to integer IDs from one shared vocabulary"""
+    vocabulary: Dict[Hashable, int] = {}
+    token_id = vocabulary.setdefault
+    return [[token_id(token, len(vocabulary)) for token in tokens] for tokens in token_lists]
+
+
+def _ngrams(tokens: List[str], n: int) -> Iterator[Tuple[str, ...]]:
+    """Lazily iterate over the n-grams of a token list, without copying it"""
+    return zip(*(islice(tokens, i, None) for i in range(n)))
+
+
+def _ngram_counts(tokens: List[str], n: int) -> Counter:
+    """Count the n-grams of a token list (unigrams are counted as plain tokens)"""
+    if n == 1:
+        return Counter(tokens)
+    return Counter(_ngrams(tokens, n))
+
+
+def _clipped_matches(candidate_counts: Counter, reference_counts: Counter) -> int:
+    """Number of candidate n-grams found in the reference, each clipped to its reference count"""
+    reference_count = reference_counts.get
+    return sum(min(count, reference_count(ngram, 0)) for ngram, count in candidate_counts.items())
+
+
+def _hashed_ngram_ids(tokens: List[str], n: int) -> "np.ndarray":
+    """64-bit IDs of the n-grams of a token list, combined from the token hashes"""
+    hashes = np.fromiter(map(hash, tokens), dtype=np.int64, count=len(tokens))
+    count = len(tokens) - n + 1
+    ids = hashes[:count].copy()
+    for k in range(1, n):
+        ids = ids * 1000003 ^ hashes[k:count + k]  # Wraps around on overflow
+    return ids
+
+
+def _count_ngram_matches(candidate_tokens: List[str], reference_tokens: List[str], n: int) -> int:
+    """
+    Number of clipped n-gram matches between a candidate and a reference
+    
+    Long texts are matched on hashed n-gram IDs with numpy (sorting and
+    intersecting in C); 64-bit IDs make collisions negligible.
+    """
+    if n < 2 or min(len(candidate_tokens), len(reference_tokens)) < _HASHED_NGRAM_MIN_TOKENS:
+        return _clipped_matches(_ngram_counts(candidate_tokens, n), _ngram_counts(reference_tokens, n))
+    
+    candidate_ids, candidate_counts = np.unique(_hashed_ngram_ids(candidate_tokens, n), return_counts=True)
+    reference_ids, reference_counts = np.unique(_hashed_ngram_ids(reference_tokens, n), return_counts=True)
+    _, candidate_index, reference_index = np.intersect1d(
+        candidate_ids, reference_ids, assume_unique=True, return_indices=True
+    )
+    return int(np.minimum(candidate_counts[candidate_index], reference_counts[reference_index]).sum())
+
+
 def calculate_rouge_score(reference: str, candidate: str, rouge_type: str = "rouge-1") -> Dict[str, float]:
     """
     Calculate ROUGE score for text similarity
@@ -203,8 +313,8 @@ def calculate_rouge_score(reference: str, candidate: str, rouge_type: str = "rou
     
     try:
         # Tokenize texts
-        reference_tokens = tokenize_text(reference)
-        candidate_tokens = tokenize_text(candidate)
+        reference_tokens = _tokenize(reference)
+        candidate_tokens = _tokenize(candidate)
         
         if not reference_tokens or not candidate_tokens:
             return {"precision": 0.0, "recall": 0.0, "f1": 0.0}
@@ -239,24 +349,12 @@ def _calculate_rouge_n(reference_tokens: List[str], candidate_tokens: List[str],
     if len(reference_tokens) < n or len(candidate_tokens) < n:
         return {"precision": 0.0, "recall": 0.0, "f1": 0.0}
     
-    # Get n-grams
-    reference_ngrams = list(zip(*[reference_tokens[i:] for i in range(n)]))
-    candidate_ngrams = list(zip(*[candidate_tokens[i:] for i in range(n)]))
-    
-    if not reference_ngrams or not candidate_ngrams:
-        return {"precision": 0.0, "recall": 0.0, "f1": 0.0}
-    
-    # Count matches
-    reference_ngram_counts = Counter(reference_ngrams)
-    candidate_ngram_counts = Counter(candidate_ngrams)
-    
-    matches = 0
-    for ngram, count in candidate_ngram_counts.items():
-        matches += min(count, reference_ngram_counts.get(ngram, 0))
+    # Count clipped n-gram matches
+    matches = _count_ngram_matches(candidate_tokens, reference_tokens, n)
     
     # Calculate precision and recall
-    precision = matches / len(candidate_ngrams) if candidate_ngrams else 0.0
-    recall = matches / len(reference_ngrams) if reference_ngrams else 0.0
+    precision = matches / (len(candidate_tokens) - n + 1)
+    recall = matches / (len(reference_tokens) - n + 1)
     
     # Calculate F1
     f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
@@ -268,6 +366,71 @@ def _calculate_rouge_n(reference_tokens: List[str], candidate_tokens: List[str],
     }
 
 
+def batch_rouge_1(references: List[str], candidates: List[str]) -> List[Dict[str, float]]:
+    """
+    Calculate ROUGE-1 for many reference/candidate pairs at once
+    
+    Maps every token in the batch to an integer ID, builds one sparse
+    (pairs x vocabulary) count matrix each for references and candidates, and
+    gets the clipped unigram matches of all pairs from a single element-wise
+    minimum, so the counting runs in C instead of one Counter per text.
+    
+    Args:
+        references: Reference texts
+        candidates: Candidate texts, one per reference
+        
+    Returns:
+        ROUGE-1 scores for each pair
+    """
+    if not references:
+        return []
+    
+    reference_tokens = [_tokenize(reference) for reference in references]
+    candidate_tokens = [_tokenize(candidate) for candidate in candidates]
+    
+    if not SKLEARN_AVAILABLE:
+        return [
+            dict(_PERFECT_SCORES) if _is_exact_match(reference, candidate) else _calculate_rouge_n(ref, cand, n=1)
+            for reference, candidate, ref, cand in zip(references, candidates, reference_tokens, candidate_tokens)
+        ]
+    
+    vocabulary: Dict[str, int] = {}
+    
+    def count_matrix(token_lists: List[Tuple[str, ...]]):
+        token_ids = np.fromiter(
+            (vocabulary.setdefault(token, len(vocabulary)) for tokens in token_lists for token in tokens),
+            dtype=np.int32
+        )
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        rows = np.repeat(np.arange(len(token_lists), dtype=np.int32), lengths)
+        # Duplicate (row, token) entries are summed into counts
+        return csr_matrix((np.ones(len(token_ids), dtype=np.int32), (rows, token_ids))), lengths
+    
+    reference_counts, reference_lengths = count_matrix(reference_tokens)
+    candidate_counts, candidate_lengths = count_matrix(candidate_tokens)
+    shape = (len(references), len(vocabulary))
+    reference_counts.resize(shape)
+    candidate_counts.resize(shape)
+    matches = np.asarray(reference_counts.minimum(candidate_counts).sum(axis=1)).ravel()
+    
+    scores = []
+    for i, (match_count, reference_length, candidate_length) in enumerate(
+        zip(matches.tolist(), reference_lengths.tolist(), candidate_lengths.tolist())
+    ):
+        if _is_exact_match(references[i], candidates[i]):
+            # Same shortcut as calculate_advanced_metrics
+            scores.append(dict(_PERFECT_SCORES))
+            continue
+        if not reference_length or not candidate_length:
+            scores.append(dict(_ZERO_SCORES))
+            continue
+        precision = match_count / candidate_length
+        recall = match_count / reference_length
+        f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
+        scores.append({"precision": float(precision), "recall": float(recall), "f1": float(f1)})
+    return scores
+
+
 def _calculate_rouge_l(reference_tokens: List[str], candidate_tokens: List[str]) -> Dict[str, float]:
     """
     Calculate ROUGE-L score (longest common subsequence)
@@ -303,6 +466,10 @@ def _longest_common_subsequence(seq1: List[str], seq2: List[str]) -> int:
     """
     Calculate the length of the longest common subsequence
     
+    Only two rows of the DP table are kept at a time. With numba installed the
+    tokens are mapped to integer IDs and the table is filled by a compiled
+    kernel.
+    
     Args:
         seq1: First sequence
         seq2: Second sequence
@@ -310,17 +477,56 @@ def _longest_common_subsequence(seq1: List[str], seq2: List[str]) -> int:
     Returns:
         Length of LCS
     """
-    m, n = len(seq1), len(seq2)
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
-    
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            if seq1[i - 1] == seq2[j - 1]:
-                dp[i][j] = dp[i - 1][j - 1] + 1
+    # Keep the shorter sequence in the inner loop (and the DP row)
+    if len(seq2) > len(seq1):
+        seq1, seq2 = seq2, seq1
+    if not seq2:
+        return 0
+    
+    if NUMBA_AVAILABLE:
+        ids1, ids2 = _token_ids(seq1, seq2)
+        return int(_lcs_length_kernel(np.array(ids1, dtype=np.int32), np.array(ids2, dtype=np.int32)))
+    
+    # Two preallocated rows swapped after each token, with the cell to the left
+    # carried in a local instead of read back from the row
+    previous = [0] * (len(seq2) + 1)
+    current = [0] * (len(seq2) + 1)
+    for token in seq1:
+        left = 0
+        for j, other in enumerate(seq2, 1):
+            if token == other:
+                left = previous[j - 1] + 1
             else:
-                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
-    
-    return dp[m][n]
+                above = previous[j]
+                if above > left:
+                    left = above
+            current[j] = left
+        previous, current = current, previous
+    
+    return previous[-1]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _lcs_length_kernel(seq1, seq2):
+        """LCS length of two int32 ID arrays using two rolling DP rows"""
+        n = seq2.shape[0]
+        previous = np.zeros(n + 1, dtype=np.int32)
+        current = np.zeros(n + 1, dtype=np.int32)
+        for i in range(seq1.shape[0]):
+            token = seq1[i]
+            for j in range(n):
+                if token == seq2[j]:
+                    current[j + 1] = previous[j] + 1
+                elif previous[j + 1] > current[j]:
+                    current[j + 1] = previous[j + 1]
+                else:
+                    current[j + 1] = current[j]
+            previous, current = current, previous
+        return previous[n]
+    
+    # Compile on import rather than on the first evaluation
+    _lcs_length_kernel(np.zeros(1, dtype=np.int32), np.zeros(1, dtype=np.int32))
 
 
 def calculate_semantic_similarity(reference: str, candidate: str, method: str = "tfidf") -> float:
@@ -354,10 +560,13 @@ def calculate_semantic_similarity(reference: str, candidate: str, method: str =
         return 0.0
 
 
+@lru_cache(maxsize=512)
 def _calculate_tfidf_similarity(reference: str, candidate: str) -> float:
     """
     Calculate TF-IDF cosine similarity
     
+    Memoized, so repeated pairs skip vectorization.
+    
     Args:
         reference: Reference text
         candidate: Candidate text
@@ -365,24 +574,51 @@ def _calculate_tfidf_similarity(reference: str, candidate: str) -> float:
     Returns:
         Similarity score
     """
+    return batch_tfidf_similarity([(reference, candidate)])[0]
+
+
+def batch_tfidf_similarity(pairs: List[Tuple[str, str]]) -> List[float]:
+    """
+    Calculate TF-IDF cosine similarity for many (reference, candidate) pairs
+    
+    Each pair is scored as if a TF-IDF vectorizer (smoothed IDF, L2 norm) were
+    fitted on just its two texts, so a pair's score never depends on the
+    other pairs in the batch. With only two documents the IDF of a term is
+    fixed by whether it occurs in one text or both, which lets every pair be
+    computed at once from hashed term counts.
+    
+    Args:
+        pairs: (reference, candidate) text pairs
+        
+    Returns:
+        Similarity score for each pair (0.0 if scikit-learn is not available)
+    """
+    n = len(pairs)
+    if n == 0 or not SKLEARN_AVAILABLE:
+        return [0.0] * n
+    
     try:
-        vectorizer = TfidfVectorizer(
-            lowercase=True,
-            stop_words='english',
-            ngram_range=(1, 2),
-            max_features=1000
-        )
+        reference_counts = _HASHING_VECTORIZER.transform([reference for reference, _ in pairs])
+        candidate_counts = _HASHING_VECTORIZER.transform([candidate for _, candidate in pairs])
         
-        # Fit and transform both texts
-        tfidf_matrix = vectorizer.fit_transform([reference, candidate])
+        # Only terms in both texts contribute to the dot product, and their IDF is 1
+        dot = np.asarray(reference_counts.multiply(candidate_counts).sum(axis=1)).ravel()
         
-        # Calculate cosine similarity
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        def squared_norms(counts, other_counts):
+            # Terms only in this text are weighted by _PAIR_IDF_ONE_TEXT
+            squares = counts.power(2)
+            total = np.asarray(squares.sum(axis=1)).ravel()
+            shared = np.asarray(squares.multiply(other_counts.sign()).sum(axis=1)).ravel()
+            return shared + _PAIR_IDF_ONE_TEXT ** 2 * (total - shared)
         
-        return float(similarity)
+        norms = np.sqrt(
+            squared_norms(reference_counts, candidate_counts) * squared_norms(candidate_counts, reference_counts)
+        )
+        similarities = np.divide(dot, norms, out=np.zeros(n), where=norms > 0)
+        return np.minimum(similarities, 1.0).tolist()
     except Exception as e:
-        logger.error(f"Error in TF-IDF similarity: {e}")
-        return 0.0
+        logger.error(f"Error in batch TF-IDF similarity: {e}")
+        return [0.0] * n
 
 
 def _calculate_jaccard_similarity(reference: str, candidate: str) -> float:
@@ -396,23 +632,37 @@ def _calculate_jaccard_similarity(reference: str, candidate: str) -> float:
     Returns:
         Similarity score
     """
-    # Tokenize and create sets
-    reference_tokens = set(tokenize_text(reference))
-    candidate_tokens = set(tokenize_text(candidate))
+    return _jaccard_similarity(reference, _tokenize(candidate))
+
+
+@lru_cache(maxsize=4096)
+def _reference_token_set(reference: str) -> FrozenSet[str]:
+    """Distinct tokens of a reference text, memoized since references repeat across a batch"""
+    return frozenset(_tokenize(reference))
+
+
+def _jaccard_similarity(reference: str, candidate_tokens: Iterable[str]) -> float:
+    """Jaccard similarity of a reference text and a tokenized candidate"""
+    reference_set = _reference_token_set(reference)
+    candidate_set = set(candidate_tokens)
     
-    if not reference_tokens or not candidate_tokens:
+    if not reference_set or not candidate_set:
         return 0.0
     
-    # Calculate Jaccard similarity
-    intersection = len(reference_tokens.intersection(candidate_tokens))
-    union = len(reference_tokens.union(candidate_tokens))
+    # |A | B| = |A| + |B| - |A & B|, without building the union
+    intersection = len(candidate_set & reference_set)
+    union = len(reference_set) + len(candidate_set) - intersection
     
     return intersection / union if union > 0 else 0.0
 
 
 def _calculate_sequence_similarity(reference: str, candidate: str) -> float:
     """
-    Calculate sequence similarity using difflib
+    Calculate sequence similarity (normalized Indel similarity)
+    
+    Equals 2*M/T where M counts characters kept by the optimal alignment,
+    the same formula as difflib's SequenceMatcher.ratio. Scores can differ
+    slightly from difflib, whose Ratcliff/Obershelp matching is not optimal.
     
     Args:
         reference: Reference text
@@ -421,20 +671,75 @@ def _calculate_sequence_similarity(reference: str, candidate: str) -> float:
     Returns:
         Similarity score
     """
-    return SequenceMatcher(None, reference, candidate).ratio()
+    return Indel.normalized_similarity(reference, candidate)
+
+
+def compute_semantic_batch(references: List[str], candidates: List[str]) -> List[Dict[str, float]]:
+    """
+    Calculate semantic similarity for many reference/candidate pairs at once
+    
+    TF-IDF similarity for the whole batch comes from one
+    batch_tfidf_similarity call, with the same scores as scoring each pair
+    on its own.
+    
+    Args:
+        references: Reference texts
+        candidates: Candidate texts, one per reference
+        
+    Returns:
+        Dictionary with tfidf, jaccard and sequence similarity for each pair
+    """
+    if not references:
+        return []
+    
+    tfidf_scores = batch_tfidf_similarity(list(zip(references, candidates)))
+    
+    similarities = []
+    for i, (reference, candidate) in enumerate(zip(references, candidates)):
+        if _is_exact_match(reference, candidate):
+            # Same shortcut as calculate_advanced_metrics
+            similarities.append({"tfidf": 1.0, "jaccard": 1.0, "sequence": 1.0})
+            continue
+        
+        if not reference or not candidate:
+            similarities.append({"tfidf": 0.0, "jaccard": 0.0, "sequence": 0.0})
+            continue
+        
+        similarities.append({
+            "tfidf": float(tfidf_scores[i]) if SKLEARN_AVAILABLE else _calculate_sequence_similarity(reference, candidate),
+            "jaccard": _jaccard_similarity(reference, _tokenize(candidate)),
+            "sequence": _calculate_sequence_similarity(reference, candidate)
+        })
+    
+    return similarities
 
 
-def calculate_advanced_metrics(reference: str, candidate: str) -> Dict[str, Any]:
+def calculate_advanced_metrics(
+    reference: str,
+    candidate: str,
+    include_semantic: bool = True,
+    include_rouge_1: bool = True
+) -> Dict[str, Any]:
     """
     Calculate all advanced evaluation metrics
     
+    A candidate that matches the reference ignoring case and surrounding
+    whitespace scores 1.0 on every metric without tokenizing either text.
+    
     Args:
         reference: Reference text
         candidate: Candidate text
+        include_semantic: Whether to calculate semantic similarity (callers
+            scoring many pairs can use compute_semantic_batch instead)
+        include_rouge_1: Whether to calculate ROUGE-1 (zeros otherwise; callers
+            scoring many pairs can use batch_rouge_1 instead)
         
     Returns:
         Dictionary with all advanced metrics
     """
+    if _is_exact_match(reference, candidate):
+        return _perfect_metrics(include_semantic)
+    
     if not reference or not candidate:
         return {
             "bleu_score": 0.0,
@@ -451,22 +756,35 @@ def calculate_advanced_metrics(reference: str, candidate: str) -> Dict[str, Any]
         }
     
     try:
+        # Tokenize once and share the tokens between BLEU, ROUGE and Jaccard
+        reference_tokens = _tokenize(reference)
+        candidate_tokens = _tokenize(candidate)
+        
+        # BLEU and ROUGE only compare tokens for equality, so they run on
+        # integer IDs, which hash and compare faster than strings
+        reference_ids, candidate_ids = _token_ids(reference_tokens, candidate_tokens)
+        
         # Calculate BLEU score
-        bleu_score = calculate_bleu_score(reference, candidate)
+        bleu_score = _calculate_bleu_tokens(reference_ids, candidate_ids, (0.25, 0.25, 0.25, 0.25))
         
         # Calculate ROUGE scores
-        rouge_scores = {
-            "rouge-1": calculate_rouge_score(reference, candidate, "rouge-1"),
-            "rouge-2": calculate_rouge_score(reference, candidate, "rouge-2"),
-            "rouge-l": calculate_rouge_score(reference, candidate, "rouge-l")
-        }
+        if reference_ids and candidate_ids:
+            rouge_scores = {
+                "rouge-1": _calculate_rouge_n(reference_ids, candidate_ids, n=1) if include_rouge_1 else dict(_ZERO_SCORES),
+                "rouge-2": _calculate_rouge_n(reference_ids, candidate_ids, n=2),
+                "rouge-l": _calculate_rouge_l(reference_ids, candidate_ids)
+            }
+        else:
+            rouge_scores = {"rouge-1": dict(_ZERO_SCORES), "rouge-2": dict(_ZERO_SCORES), "rouge-l": dict(_ZERO_SCORES)}
         
         # Calculate semantic similarity
-        semantic_similarity = {
-            "tfidf": calculate_semantic_similarity(reference, candidate, "tfidf"),
-            "jaccard": calculate_semantic_similarity(reference, candidate, "jaccard"),
-            "sequence": calculate_semantic_similarity(reference, candidate, "sequence")
-        }
+        semantic_similarity = {}
+        if include_semantic:
+            semantic_similarity = {
+                "tfidf": calculate_semantic_similarity(reference, candidate, "tfidf"),
+                "jaccard": _jaccard_similarity(reference, candidate_tokens),
+                "sequence": calculate_semantic_similarity(reference, candidate, "sequence")
+            }
         
         return {
             "bleu_score": bleu_score,
@@ -491,6 +809,75 @@ def calculate_advanced_metrics(reference: str, candidate: str) -> Dict[str, Any]
         }
 
 
+def _is_exact_match(reference: str, candidate: str) -> bool:
+    """Whether two non-empty texts match ignoring case and surrounding whitespace"""
+    reference = reference.strip()
+    return bool(reference) and reference.lower() == candidate.strip().lower()
+
+
+def _perfect_metrics(include_semantic: bool) -> Dict[str, Any]:
+    """Metrics for a candidate that matches its reference exactly"""
+    return {
+        "bleu_score": 1.0,
+        "rouge_scores": {
+            "rouge-1": dict(_PERFECT_SCORES),
+            "rouge-2": dict(_PERFECT_SCORES),
+            "rouge-l": dict(_PERFECT_SCORES)
+        },
+        "semantic_similarity": {"tfidf": 1.0, "jaccard": 1.0, "sequence": 1.0} if include_semantic else {}
+    }
+
+
+async def calculate_advanced_metrics_async(
+    reference: str,
+    candidate: str,
+    include_semantic: bool = True,
+    include_rouge_1: bool = True
+) -> Dict[str, Any]:
+    """
+    Calculate all advanced evaluation metrics in a worker thread
+    
+    Keeps the CPU-bound scoring off the event loop, so other requests and
+    in-flight model calls are served while a response is being scored.
+    
+    Args:
+        reference: Reference text
+        candidate: Candidate text
+        include_semantic: Whether to calculate semantic similarity
+        include_rouge_1: Whether to calculate ROUGE-1
+        
+    Returns:
+        Dictionary with all advanced metrics
+    """
+    if _is_exact_match(reference, candidate):
+        # Nothing to compute, so skip the hop to the worker thread
+        return _perfect_metrics(include_semantic)
+    
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _METRIC_POOL,
+        partial(calculate_advanced_metrics, reference, candidate, include_semantic, include_rouge_1)
+    )
+
+
+async def run_in_metric_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a CPU-bound scoring function in a worker thread
+    
+    Uses the same threads as calculate_advanced_metrics_async, for batch
+    scoring that would otherwise block the event loop.
+    
+    Args:
+        func: Function to call
+        *args: Positional arguments for func
+        
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_METRIC_POOL, partial(func, *args))
+
+
 # Initialize NLTK data on module import
 if NLTK_AVAILABLE:
     download_nltk_data() 
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+Response caches for LLM calls
+Lets repeated prompts skip the model API round-trip
+"""
+
+import re
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+import orjson
+
+from app.config import settings
+from app.models import EvaluationResult, ModelParameters, PromptData
+from app.utils.storage import bounded_map, evaluation_store
+
+logger = logging.getLogger(__name__)
+
+# Cached model output: (response_text, api_metadata)
+CachedResponse = Tuple[str, Dict[str, Any]]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt for cache lookups (case and whitespace insensitive)"""
+    return _WHITESPACE_RE.sub(" ", prompt).strip().lower()
+
+
+def is_cacheable(parameters: Optional[ModelParameters]) -> bool:
+    """Only deterministic (temperature 0) calls are cached, so sampling stays random"""
+    return parameters is not None and parameters.temperature == 0
+
+
+class ResultCache:
+    """
+    Exact-match cache of evaluation results
+
+    Keyed by a BLAKE2b hash of the model, normalized prompt, expected output and
+    parameters. Uses Redis when the evaluation store is Redis-backed, otherwise
+    a bounded in-process LRU.
+    """
+
+    KEY_PREFIX = "evalcache:"
+
+    def __init__(self, redis=None, ttl_seconds: int = 7 * 86400, max_entries: int = 4096):
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def key(self, prompt_data: PromptData, model: str, parameters: ModelParameters) -> str:
+        """Cache key for evaluating a prompt with a model and parameters"""
+        payload = orjson.dumps(
+            [model, normalize_prompt(prompt_data.prompt), prompt_data.expected_output, parameters.model_dump()],
+            option=orjson.OPT_SORT_KEYS
+        )
+        return self.KEY_PREFIX + blake2b(payload, digest_size=16).hexdigest()
+
+    async def get_many(self, keys: List[str]) -> List[Optional[EvaluationResult]]:
+        """Get cached results for several keys in one round-trip"""
+        if not keys:
+            return []
+
+        if self.redis is not None:
+            blobs = await self.redis.mget(keys)
+        else:
+            blobs = []
+            for key in keys:
+                blob = self.entries.get(key)
+                if blob is not None:
+                    self.entries.move_to_end(key)
+                blobs.append(blob)
+
+        return [
+            EvaluationResult.model_validate_json(blob) if blob is not None else None
+            for blob in blobs
+        ]
+
+    async def set_many(self, items: Dict[str, EvaluationResult]):
+        """Cache several results"""
+        if not items:
+            return
+
+        encoded = {key: result.model_dump_json() for key, result in items.items()}
+        if self.redis is not None:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, blob in encoded.items():
+                    pipe.set(key, blob, ex=self.ttl_seconds)
+                await pipe.execute()
+            return
+
+        for key, blob in encoded.items():
+            self.entries[key] = blob.encode()
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class LLMResponseCache:
+    """
+    Exact-match cache of model responses
+    
+    Keyed by a BLAKE2b hash of the model, prompt and API parameters. Uses
+    Redis when the evaluation store is Redis-backed, otherwise an in-process
+    map bounded by size (and by age when cachetools is available).
+    """
+    
+    KEY_PREFIX = "llmcache:"
+    
+    def __init__(self, redis=None, ttl_seconds: int = 3600, max_entries: int = 10000):
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.entries = bounded_map(max_entries, ttl_seconds)
+    
+    def key(self, prompt: str, model: str, parameters: Dict[str, Any]) -> str:
+        """Cache key for calling a model with a prompt and API parameters"""
+        payload = orjson.dumps([model, prompt, parameters], option=orjson.OPT_SORT_KEYS)
+        return self.KEY_PREFIX + blake2b(payload, digest_size=16).hexdigest()
+    
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Get a cached response, or None"""
+        if self.redis is not None:
+            blob = await self.redis.get(key)
+        else:
+            blob = self.entries.get(key)
+        return self.decode(blob)
+    
+    async def get_many(self, keys: List[str]) -> List[Optional[CachedResponse]]:
+        """Get cached responses (or None) for several keys in one round-trip"""
+        if not keys:
+            return []
+        
+        if self.redis is not None:
+            blobs = await self.redis.mget(keys)
+        else:
+            blobs = [self.entries.get(key) for key in keys]
+        return [self.decode(blob) for blob in blobs]
+    
+    @staticmethod
+    def decode(blob: Optional[bytes]) -> Optional[CachedResponse]:
+        """Decode a stored response, or None if nothing was stored"""
+        if blob is None:
+            return None
+        
+        response_text, metadata = orjson.loads(blob)
+        return response_text, metadata
+    
+    async def set(self, key: str, response: CachedResponse):
+        """Cache a response"""
+        try:
+            blob = orjson.dumps(response)
+        except TypeError as e:
+            logger.warning("Not caching LLM response, metadata is not serializable: %s", e)
+            return
+        
+        if self.redis is not None:
+            await self.redis.set(key, blob, ex=self.ttl_seconds)
+        else:
+            self.entries[key] = blob
+
+
+# Global exact-match result cache instance
+result_cache = ResultCache(evaluation_store.redis, settings.result_cache_ttl_seconds)
+
+# Global LLM response cache instance (None when disabled)
+llm_cache: Optional[LLMResponseCache] = (
+    LLMResponseCache(evaluation_store.redis, settings.llm_cache_ttl_seconds, settings.llm_cache_max_entries)
+    if settings.enable_llm_cache
+    else None
+)
@@ -5,11 +5,13 @@ Includes scoring, OpenAI API integration, and analysis functions
 
 import asyncio
 import time
+from contextlib import nullcontext
 from typing import List, Dict, Any, Tuple, Optional
 import logging
 from datetime import datetime
 import re
 
+import numpy as np
 import openai
 from rapidfuzz import fuzz
 from rapidfuzz.distance import Levenshtein
@@ -21,10 +23,16 @@ from app.models import (
     ModelParameters, 
     SecurityAnalysis, 
     SecurityAlert,
-    AdvancedMetrics,
     ModelInfo
 )
-from .advanced_metrics import calculate_advanced_metrics
+from app.models.internal import AdvancedMetricsData, InternalEvaluationResult
+from .advanced_metrics import (
+    batch_rouge_1,
+    calculate_advanced_metrics_async,
+    compute_semantic_batch,
+    run_in_metric_pool
+)
+from .cache import CachedResponse, llm_cache
 from .providers import (
     provider_manager, 
     OpenAIProvider, 
@@ -35,8 +43,37 @@ from .providers import (
     ProviderConfig
 )
 
+# Pairwise batch scoring (rapidfuzz >= 3.6)
+try:
+    from rapidfuzz.process import cpdist
+    CPDIST_AVAILABLE = True
+except ImportError:
+    CPDIST_AVAILABLE = False
+
+# Optional client-side rate limiting of LLM API calls
+try:
+    from aiolimiter import AsyncLimiter
+    AIOLIMITER_AVAILABLE = True
+except ImportError:
+    AIOLIMITER_AVAILABLE = False
+
+# Optional multi-keyword matcher for toxicity detection
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Limits outgoing LLM API calls to the provider's requests-per-minute quota
+llm_rate_limiter = None
+if settings.llm_requests_per_minute > 0:
+    if AIOLIMITER_AVAILABLE:
+        llm_rate_limiter = AsyncLimiter(settings.llm_requests_per_minute, 60)
+    else:
+        logger.warning("LLM_REQUESTS_PER_MINUTE is set but aiolimiter is not available, calls are not rate limited")
+
 # Initialize providers based on configuration
 def initialize_providers():
     """Initialize available providers based on configuration"""
@@ -170,6 +207,10 @@ def calculate_fuzzy_match(response: str, expected: str) -> float:
     if not response or not expected:
         return 0.0
     
+    # Every scorer gives identical strings 100
+    if response == expected:
+        return 100.0
+    
     # Calculate different similarity scores
     scores = []
     
@@ -193,6 +234,64 @@ def calculate_fuzzy_match(response: str, expected: str) -> float:
     return float(max(scores))
 
 
+# Injection patterns and the alert type each one reports
+INJECTION_PATTERNS = [
+    (r"ignore\s+(?:previous|earlier|all)\s+(?:instructions?|prompts?|commands?)", "ignore_instructions"),
+    (r"forget\s+(?:everything|all|previous)", "forget_command"),
+    (r"act\s+as\s+(?:a\s+)?(?:different|new|another)", "role_change"),
+    (r"pretend\s+(?:to\s+be|you\s+are)", "pretend_command"),
+    (r"disregard\s+(?:all|previous|the)", "disregard_command"),
+    (r"override\s+(?:security|safety|instructions)", "override_command"),
+    (r"sudo\s+mode", "sudo_command"),
+    (r"developer\s+mode", "developer_mode"),
+    (r"jailbreak", "jailbreak_attempt"),
+]
+
+# All injection patterns as one alternation, each in a group named after its alert type
+INJECTION_PATTERNS_RE = re.compile(
+    "|".join(f"(?P<{alert_type}>{pattern})" for pattern, alert_type in INJECTION_PATTERNS),
+    re.IGNORECASE
+)
+
+
+# Scorers combined by calculate_fuzzy_match, the highest score wins
+FUZZY_SCORERS = (fuzz.token_sort_ratio, fuzz.token_set_ratio, fuzz.partial_ratio, fuzz.ratio)
+
+
+def batch_fuzzy_match(responses: List[str], expected_outputs: List[str]) -> List[float]:
+    """
+    Calculate fuzzy match scores for many (response, expected output) pairs
+    
+    Gives the same scores as calling calculate_fuzzy_match on each pair, but
+    with rapidfuzz's cpdist each scorer runs over the whole batch in one
+    multi-threaded C++ call. Falls back to scoring pair by pair on rapidfuzz
+    versions without cpdist.
+    
+    Args:
+        responses: Model responses
+        expected_outputs: Expected outputs, one per response
+        
+    Returns:
+        Fuzzy match score (0-100) for each pair
+    """
+    if not CPDIST_AVAILABLE or len(responses) < 2:
+        return [calculate_fuzzy_match(r, e) for r, e in zip(responses, expected_outputs)]
+    
+    responses = [response.strip() if response else "" for response in responses]
+    expected_outputs = [expected.strip() if expected else "" for expected in expected_outputs]
+    
+    scores = np.maximum.reduce([
+        cpdist(responses, expected_outputs, scorer=scorer, dtype=np.float64, workers=-1)
+        for scorer in FUZZY_SCORERS
+    ])
+    
+    # Empty strings never match (rapidfuzz would score two empty strings as 100)
+    return [
+        float(score) if response and expected else 0.0
+        for score, response, expected in zip(scores.tolist(), responses, expected_outputs)
+    ]
+
+
 def detect_prompt_injection(prompt: str) -> SecurityAnalysis:
     """
     Detect potential prompt injection attempts
@@ -204,32 +303,16 @@ def detect_prompt_injection(prompt: str) -> SecurityAnalysis:
         Security analysis with alerts and score
     """
     alerts = []
-    detected_patterns = []
-    
-    # Convert to lowercase for pattern matching
-    prompt_lower = prompt.lower()
-    
-    # Check for injection keywords
-    for keyword in settings.INJECTION_KEYWORDS:
-        if keyword.lower() in prompt_lower:
-            detected_patterns.append(keyword)
-    
-    # Additional pattern checks
-    injection_patterns = [
-        (r"ignore\s+(?:previous|earlier|all)\s+(?:instructions?|prompts?|commands?)", "ignore_instructions"),
-        (r"forget\s+(?:everything|all|previous)", "forget_command"),
-        (r"act\s+as\s+(?:a\s+)?(?:different|new|another)", "role_change"),
-        (r"pretend\s+(?:to\s+be|you\s+are)", "pretend_command"),
-        (r"disregard\s+(?:all|previous|the)", "disregard_command"),
-        (r"override\s+(?:security|safety|instructions)", "override_command"),
-        (r"sudo\s+mode", "sudo_command"),
-        (r"developer\s+mode", "developer_mode"),
-        (r"jailbreak", "jailbreak_attempt"),
-    ]
     
-    for pattern, alert_type in injection_patterns:
-        if re.search(pattern, prompt_lower):
-            detected_patterns.append(alert_type)
+    # Check for injection keywords in a single scan, each reported once in order of appearance
+    detected_patterns = list(dict.fromkeys(match.lower() for match in settings.INJECTION_KEYWORDS_RE.findall(prompt)))
+    
+    # Additional pattern checks, all patterns in a single scan. Keywords stay
+    # a separate scan: they overlap the patterns ("act as", "pretend to be")
+    # and one alternation would report only one of two overlapping matches.
+    matched_types = {match.lastgroup for match in INJECTION_PATTERNS_RE.finditer(prompt)}
+    if matched_types:
+        detected_patterns.extend(alert_type for _, alert_type in INJECTION_PATTERNS if alert_type in matched_types)
     
     # Create security alerts
     if detected_patterns:
@@ -257,6 +340,27 @@ def detect_prompt_injection(prompt: str) -> SecurityAnalysis:
     )
 
 
+# Keywords for the placeholder toxicity check. Without pyahocorasick each is
+# found with a plain substring search, which for a list this short is faster
+# than one regex alternation over the text.
+TOXIC_KEYWORDS = (
+    "hate", "kill", "violence", "harmful", "dangerous",
+    "offensive", "inappropriate", "toxic", "abusive"
+)
+
+
+def _build_keyword_automaton(keywords):
+    """Aho-Corasick automaton that finds all keywords in one pass over a text"""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+TOXIC_KEYWORDS_AUTOMATON = _build_keyword_automaton(TOXIC_KEYWORDS) if AHOCORASICK_AVAILABLE else None
+
+
 def detect_toxicity(text: str) -> bool:
     """
     Placeholder for toxicity detection
@@ -275,19 +379,41 @@ def detect_toxicity(text: str) -> bool:
         return False
     
     # Simple keyword-based detection for demonstration
-    toxic_keywords = [
-        "hate", "kill", "violence", "harmful", "dangerous",
-        "offensive", "inappropriate", "toxic", "abusive"
-    ]
-    
     text_lower = text.lower()
-    return any(keyword in text_lower for keyword in toxic_keywords)
+    if TOXIC_KEYWORDS_AUTOMATON is not None:
+        return next(TOXIC_KEYWORDS_AUTOMATON.iter(text_lower), None) is not None
+    return any(keyword in text_lower for keyword in TOXIC_KEYWORDS)
+
+
+def score_batch(
+    responses: List[str],
+    expected_outputs: List[str]
+) -> Tuple[List[float], List[Dict[str, float]], List[Dict[str, float]]]:
+    """
+    Calculate the scores deferred by batch evaluation for all pairs at once
+    
+    CPU-bound; evaluate_prompts_batch runs it in a metrics worker thread.
+    
+    Args:
+        responses: Model responses
+        expected_outputs: Expected outputs, one per response
+        
+    Returns:
+        Tuple of (fuzzy match scores, semantic similarities, ROUGE-1 scores),
+        one entry per pair in each
+    """
+    return (
+        batch_fuzzy_match(responses, expected_outputs),
+        compute_semantic_batch(expected_outputs, responses),
+        batch_rouge_1(expected_outputs, responses)
+    )
 
 
 async def call_llm_api(
     prompt: str, 
     model: str, 
-    parameters: Optional[ModelParameters] = None
+    parameters: Optional[ModelParameters] = None,
+    check_cache: bool = True
 ) -> Tuple[str, Dict[str, Any]]:
     """
     Call LLM API with the given prompt and parameters using the appropriate provider
@@ -296,6 +422,8 @@ async def call_llm_api(
         prompt: Input prompt
         model: Model name (e.g., 'gpt-3.5-turbo', 'claude-3-sonnet-20240229')
         parameters: Model parameters
+        check_cache: Whether to look up the LLM response cache first (the
+            response is cached either way)
         
     Returns:
         Tuple of (response_text, metadata)
@@ -309,28 +437,71 @@ async def call_llm_api(
             parameters = ModelParameters()
         
         # Convert parameters to dict for provider
-        param_dict = parameters.dict(exclude_none=True)
+        param_dict = parameters.model_dump(exclude_none=True)
+        
+        # Reuse the response of an identical earlier call
+        if llm_cache is not None:
+            cache_key = llm_cache.key(prompt, model, param_dict)
+            cached = await llm_cache.get(cache_key) if check_cache else None
+            if cached is not None:
+                return _tag_cached(cached)
         
         # Get the appropriate provider for the model
-        provider = provider_manager.get_provider_for_model(model)
+        provider, model_id = provider_manager.resolve(model)
         if not provider:
             raise EvaluationError(f"No provider found for model: {model}")
         
         # Call the provider
-        response_text, metadata = await provider.generate(prompt, model, param_dict)
+        if llm_rate_limiter is not None:
+            async with llm_rate_limiter:
+                response_text, metadata = await provider.generate(prompt, model_id, param_dict)
+        else:
+            response_text, metadata = await provider.generate(prompt, model_id, param_dict)
+        
+        if llm_cache is not None:
+            await llm_cache.set(cache_key, (response_text, metadata))
         
         return response_text, metadata
         
     except Exception as e:
-        logger.error(f"LLM API error for model {model}: {str(e)}")
+        logger.error("LLM API error for model %s: %s", model, e)
         raise EvaluationError(f"API error: {str(e)}")
 
 
+def _tag_cached(cached: CachedResponse) -> Tuple[str, Dict[str, Any]]:
+    """Response text and metadata of a cached response, marked as cached"""
+    response_text, metadata = cached
+    return response_text, {**metadata, "cached": True}
+
+
+async def lookup_cached_responses(
+    prompts: List[PromptData],
+    model: str,
+    parameters: Optional[ModelParameters] = None
+) -> List[Optional[CachedResponse]]:
+    """
+    Look up LLM response cache entries for several prompts in one round-trip
+    
+    Returns:
+        Cached response or None for each prompt (all None when the cache is disabled)
+    """
+    if llm_cache is None:
+        return [None] * len(prompts)
+    
+    param_dict = (parameters or ModelParameters()).model_dump(exclude_none=True)
+    return await llm_cache.get_many([llm_cache.key(p.prompt, model, param_dict) for p in prompts])
+
+
 async def evaluate_single_prompt(
     prompt_data: PromptData,
     model: str,
     parameters: Optional[ModelParameters] = None,
-    result_id: Optional[str] = None
+    result_id: Optional[str] = None,
+    cached_response: Optional[CachedResponse] = None,
+    check_cache: bool = True,
+    include_semantic: bool = True,
+    include_fuzzy: bool = True,
+    include_rouge_1: bool = True
 ) -> EvaluationResult:
     """
     Evaluate a single prompt against a model
@@ -340,6 +511,14 @@ async def evaluate_single_prompt(
         model: Model name to use
         parameters: Model parameters
         result_id: Optional custom ID for the result
+        cached_response: Previously cached model output to score instead of calling the API
+        check_cache: Whether to look up the LLM response cache when no cached response is given
+        include_semantic: Whether to calculate semantic similarity here (batch
+            callers fill it in afterwards for all results at once)
+        include_fuzzy: Whether to calculate the fuzzy match score here (batch
+            callers fill it in afterwards with batch_fuzzy_match)
+        include_rouge_1: Whether to calculate ROUGE-1 here (batch callers fill
+            it in afterwards with batch_rouge_1)
         
     Returns:
         Evaluation result with scores and analysis
@@ -350,20 +529,29 @@ async def evaluate_single_prompt(
         # Security analysis on the prompt
         security_analysis = detect_prompt_injection(prompt_data.prompt)
         
-        # Call the model API
-        model_response, api_metadata = await call_llm_api(
-            prompt_data.prompt, 
-            model, 
-            parameters
-        )
+        # Score a response found in the cache beforehand, otherwise call the model API
+        if cached_response is not None:
+            model_response, api_metadata = _tag_cached(cached_response)
+        else:
+            model_response, api_metadata = await call_llm_api(
+                prompt_data.prompt, 
+                model, 
+                parameters,
+                check_cache=check_cache
+            )
         
         # Calculate scores
         exact_match = calculate_exact_match(model_response, prompt_data.expected_output)
-        fuzzy_match = calculate_fuzzy_match(model_response, prompt_data.expected_output)
+        fuzzy_match = calculate_fuzzy_match(model_response, prompt_data.expected_output) if include_fuzzy else 0.0
         
         # Calculate advanced metrics
-        advanced_metrics_data = calculate_advanced_metrics(prompt_data.expected_output, model_response)
-        advanced_metrics = AdvancedMetrics(
+        advanced_metrics_data = await calculate_advanced_metrics_async(
+            prompt_data.expected_output,
+            model_response,
+            include_semantic=include_semantic,
+            include_rouge_1=include_rouge_1
+        )
+        advanced_metrics = AdvancedMetricsData(
             bleu_score=advanced_metrics_data["bleu_score"],
             rouge_scores=advanced_metrics_data["rouge_scores"],
             semantic_similarity=advanced_metrics_data["semantic_similarity"]
@@ -378,7 +566,7 @@ async def evaluate_single_prompt(
             security_flags = [alert.type for alert in security_analysis.alerts]
         
         # Create result
-        result = EvaluationResult(
+        result = InternalEvaluationResult(
             id=result_id or f"{int(time.time() * 1000000)}",
             prompt=prompt_data.prompt,
             model_response=model_response,
@@ -395,14 +583,17 @@ async def evaluate_single_prompt(
         )
         
         evaluation_time = time.time() - start_time
-        logger.info(f"Evaluated prompt in {evaluation_time:.2f}s - exact: {exact_match:.1f}%, fuzzy: {fuzzy_match:.1f}%")
+        if include_fuzzy:
+            logger.info("Evaluated prompt in %.2fs - exact: %.1f%%, fuzzy: %.1f%%", evaluation_time, exact_match, fuzzy_match)
+        else:
+            logger.info("Evaluated prompt in %.2fs - exact: %.1f%%", evaluation_time, exact_match)
         
-        return result
+        return result.to_schema()
         
     except EvaluationError:
         raise
     except Exception as e:
-        logger.error(f"Error evaluating prompt: {str(e)}")
+        logger.error("Error evaluating prompt: %s", e)
         raise EvaluationError(f"Evaluation failed: {str(e)}")
 
 
@@ -410,68 +601,99 @@ async def evaluate_prompts_batch(
     prompts: List[PromptData],
     model: str,
     parameters: Optional[ModelParameters] = None,
-    batch_size: int = 5,
-    progress_callback: Optional[callable] = None
+    max_concurrency: Optional[int] = None,
+    progress_callback: Optional[callable] = None,
+    result_callback: Optional[callable] = None
 ) -> List[EvaluationResult]:
     """
-    Evaluate multiple prompts in batches with progress tracking
+    Evaluate multiple prompts concurrently with progress tracking
     
     Args:
         prompts: List of prompts to evaluate
         model: Model name to use
         parameters: Model parameters
-        batch_size: Number of concurrent evaluations
-        progress_callback: Optional callback for progress updates
+        max_concurrency: Maximum number of evaluations in flight
+            (defaults to settings.max_concurrent_llm_calls)
+        progress_callback: Optional callback for progress updates, called as each prompt finishes
+        result_callback: Optional callback receiving each result as soon as it finishes
         
     Returns:
-        List of evaluation results
+        List of evaluation results in prompt order
     """
-    results = []
     total_prompts = len(prompts)
-    
-    # Process in batches to avoid overwhelming the API
-    for i in range(0, total_prompts, batch_size):
-        batch = prompts[i:i + batch_size]
-        
-        # Create tasks for concurrent evaluation
-        tasks = []
-        for j, prompt_data in enumerate(batch):
-            result_id = f"eval_{i + j + 1}"
-            task = evaluate_single_prompt(prompt_data, model, parameters, result_id)
-            tasks.append(task)
+    results: List[Optional[EvaluationResult]] = [None] * total_prompts
+    semaphore = asyncio.Semaphore(max_concurrency or settings.max_concurrent_llm_calls)
+    
+    # Look up cached responses for all prompts before any API call starts
+    cached_responses = await lookup_cached_responses(prompts, model, parameters)
+    
+    # Without a per-result callback nothing sees a result before the batch is
+    # done, so fuzzy match, ROUGE-1 and semantic similarity are calculated for
+    # all results in one pass
+    defer_scoring = result_callback is None
+    
+    async def evaluate_bounded(index: int) -> Tuple[int, Any]:
+        # Prompts with a cached response make no API call, so they don't take a slot
+        async with semaphore if cached_responses[index] is None else nullcontext():
+            try:
+                result = await evaluate_single_prompt(
+                    prompts[index],
+                    model,
+                    parameters,
+                    f"eval_{index + 1}",
+                    cached_response=cached_responses[index],
+                    check_cache=False,
+                    include_semantic=not defer_scoring,
+                    include_fuzzy=not defer_scoring,
+                    include_rouge_1=not defer_scoring
+                )
+            except Exception as e:
+                result = e
+        return index, result
+    
+    # Start every evaluation; the semaphore keeps at most max_concurrency API calls in flight
+    completed = 0
+    for next_done in asyncio.as_completed([evaluate_bounded(i) for i in range(total_prompts)]):
+        index, result = await next_done
         
-        # Execute batch concurrently
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+        if isinstance(result, Exception):
+            logger.error("Batch evaluation error: %s", result)
+            # Create error result
+            error_result = InternalEvaluationResult(
+                id=f"error_{int(time.time() * 1000000)}",
+                prompt="Error processing prompt",
+                model_response=f"Error: {str(result)}",
+                expected_output="N/A",
+                exact_match=0.0,
+                fuzzy_match=0.0,
+                toxicity=False,
+                model=model,
+                timestamp=datetime.utcnow().isoformat(),
+                parameters=parameters
+            )
+            result = error_result.to_schema()
         
-        # Handle results and exceptions
-        for result in batch_results:
-            if isinstance(result, Exception):
-                logger.error(f"Batch evaluation error: {str(result)}")
-                # Create error result
-                error_result = EvaluationResult(
-                    id=f"error_{int(time.time() * 1000000)}",
-                    prompt="Error processing prompt",
-                    model_response=f"Error: {str(result)}",
-                    expected_output="N/A",
-                    exact_match=0.0,
-                    fuzzy_match=0.0,
-                    toxicity=False,
-                    model=model,
-                    timestamp=datetime.utcnow().isoformat(),
-                    parameters=parameters
-                )
-                results.append(error_result)
-            else:
-                results.append(result)
+        results[index] = result
+        completed += 1
+        if result_callback:
+            await result_callback(result)
         
         # Progress callback
         if progress_callback:
-            progress = min(100.0, (len(results) / total_prompts) * 100)
-            await progress_callback(len(results), total_prompts, progress)
-        
-        # Small delay between batches to be respectful to the API
-        if i + batch_size < total_prompts:
-            await asyncio.sleep(0.5)
+            progress = min(100.0, (completed / total_prompts) * 100)
+            await progress_callback(completed, total_prompts, progress)
+    
+    if defer_scoring:
+        scored = [result for result in results if result.advanced_metrics is not None]
+        fuzzy_scores, similarities, rouge_1_scores = await run_in_metric_pool(
+            score_batch,
+            [result.model_response for result in scored],
+            [result.expected_output for result in scored]
+        )
+        for result, fuzzy_match, similarity, rouge_1 in zip(scored, fuzzy_scores, similarities, rouge_1_scores):
+            result.fuzzy_match = fuzzy_match
+            result.advanced_metrics.semantic_similarity = similarity
+            result.advanced_metrics.rouge_scores["rouge-1"] = rouge_1
     
-    logger.info(f"Completed evaluation of {len(results)} prompts")
-    return results 
\ No newline at end of file
+    logger.info("Completed evaluation of %d prompts", len(results))
+    return results
@@ -3,22 +3,75 @@ File processing utilities for handling CSV and JSONL uploads
 Includes validation, parsing, and normalization functions
 """
 
+import codecs
 import csv
-import json
 import io
-from typing import List, Dict, Any, Tuple
-import pandas as pd
+from itertools import chain
+from typing import List, Dict, Any, BinaryIO, Iterable, TextIO, Tuple, Union
+import orjson
 from fastapi import HTTPException
 import logging
 
 logger = logging.getLogger(__name__)
 
+_UTF8_BOM = codecs.BOM_UTF8
+
 
 class FileProcessingError(Exception):
     """Custom exception for file processing errors"""
     pass
 
 
+class _ChunkStream(io.RawIOBase):
+    """Read-only binary stream over an iterable of byte chunks"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b""
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def open_binary_stream(chunks: Iterable[bytes]) -> BinaryIO:
+    """
+    Read an iterable of byte chunks as a buffered binary stream
+    
+    Args:
+        chunks: Raw file content split into chunks
+        
+    Returns:
+        Binary stream whose lines can be iterated without decoding them
+    """
+    return io.BufferedReader(_ChunkStream(chunks))
+
+
+def open_text_stream(chunks: Iterable[bytes], encoding: str) -> TextIO:
+    """
+    Decode an iterable of byte chunks as a text stream
+    
+    Args:
+        chunks: Raw file content split into chunks
+        encoding: Text encoding of the content
+        
+    Returns:
+        Text stream that decodes the chunks as it is read
+    """
+    # newline="" keeps line endings intact, as the csv module expects
+    return io.TextIOWrapper(open_binary_stream(chunks), encoding=encoding, newline="")
+
+
 def validate_file_size(content_length: int, max_size_bytes: int) -> None:
     """
     Validate file size against maximum allowed size
@@ -64,12 +117,12 @@ def validate_file_type(filename: str, allowed_extensions: List[str]) -> None:
     )
 
 
-def parse_csv_content(content: str) -> List[Dict[str, Any]]:
+def parse_csv_content(content: TextIO) -> List[Dict[str, Any]]:
     """
     Parse CSV content and return list of dictionaries
     
     Args:
-        content: Raw CSV content as string
+        content: CSV content as a text stream, read row by row
         
     Returns:
         List of dictionaries with parsed data
@@ -78,33 +131,33 @@ def parse_csv_content(content: str) -> List[Dict[str, Any]]:
         FileProcessingError: If CSV parsing fails
     """
     try:
-        # Use StringIO to treat string as file-like object
-        csv_file = io.StringIO(content)
-        
-        # Try to detect delimiter
-        sample = content[:1024]
+        # Try to detect delimiter (completing the last line of the sample
+        # so that the rows can be read from the sample and then the stream)
+        sample = content.read(1024)
+        sample += content.readline()
+        csv_file = chain(io.StringIO(sample), content)
         sniffer = csv.Sniffer()
         try:
             delimiter = sniffer.sniff(sample).delimiter
         except csv.Error:
             delimiter = ','  # Default to comma
         
-        # Read CSV
-        reader = csv.DictReader(csv_file, delimiter=delimiter)
+        # Read CSV, cleaning the header once instead of every row's keys
+        reader = csv.reader(csv_file, delimiter=delimiter)
+        keys = [key.strip().lower() for key in next(reader, [])]
         
         data = []
-        for row_num, row in enumerate(reader, start=2):  # Start at 2 since header is row 1
+        for row in reader:
+            values = [value.strip() for value in row]
+            
             # Filter out empty rows
-            if not any(value.strip() for value in row.values() if value):
+            if not any(values):
                 continue
-                
-            # Clean up the row data
-            cleaned_row = {}
-            for key, value in row.items():
-                if key is not None:  # Skip None keys
-                    cleaned_key = key.strip().lower()
-                    cleaned_value = value.strip() if value else ""
-                    cleaned_row[cleaned_key] = cleaned_value
+            
+            # Missing trailing values are empty, values without a column are dropped
+            if len(values) < len(keys):
+                values.extend([""] * (len(keys) - len(values)))
+            cleaned_row = dict(zip(keys, values))
             
             if cleaned_row:  # Only add non-empty rows
                 data.append(cleaned_row)
@@ -116,16 +169,20 @@ def parse_csv_content(content: str) -> List[Dict[str, Any]]:
         
     except csv.Error as e:
         raise FileProcessingError(f"Failed to parse CSV: {str(e)}")
+    except (FileProcessingError, UnicodeDecodeError):
+        raise
     except Exception as e:
         raise FileProcessingError(f"Unexpected error parsing CSV: {str(e)}")
 
 
-def parse_jsonl_content(content: str) -> List[Dict[str, Any]]:
+def parse_jsonl_content(content: Iterable[Union[str, bytes]]) -> List[Dict[str, Any]]:
     """
     Parse JSONL content and return list of dictionaries
     
+    Lines given as bytes are passed to orjson without decoding them first.
+    
     Args:
-        content: Raw JSONL content as string
+        content: JSONL content as a text or binary stream (or any iterable of lines)
         
     Returns:
         List of dictionaries with parsed data
@@ -135,20 +192,26 @@ def parse_jsonl_content(content: str) -> List[Dict[str, Any]]:
     """
     try:
         data = []
-        lines = content.strip().split('\n')
         
-        for line_num, line in enumerate(lines, start=1):
+        for line_num, line in enumerate(content, start=1):
             line = line.strip()
+            if line_num == 1:
+                # orjson rejects a byte order mark
+                line = line.removeprefix(_UTF8_BOM if isinstance(line, bytes) else "\ufeff")
             if not line:  # Skip empty lines
                 continue
                 
             try:
-                parsed_line = json.loads(line)
+                parsed_line = orjson.loads(line)
                 if isinstance(parsed_line, dict):
                     data.append(parsed_line)
                 else:
                     logger.warning(f"Line {line_num} is not a JSON object, skipping")
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
+                if isinstance(line, bytes):
+                    # Raises UnicodeDecodeError if the line is not UTF-8, so
+                    # the caller can retry with another encoding
+                    line.decode('utf-8')
                 raise FileProcessingError(f"Invalid JSON on line {line_num}: {str(e)}")
         
         if not data:
@@ -157,11 +220,26 @@ def parse_jsonl_content(content: str) -> List[Dict[str, Any]]:
         return data
         
     except Exception as e:
-        if isinstance(e, FileProcessingError):
+        if isinstance(e, (FileProcessingError, UnicodeDecodeError)):
             raise
         raise FileProcessingError(f"Unexpected error parsing JSONL: {str(e)}")
 
 
+# Common field mappings, in order of preference
+PROMPT_FIELDS = ('prompt', 'question', 'input', 'query')
+EXPECTED_FIELDS = ('expected_output', 'expected', 'answer', 'output', 'target', 'ground_truth')
+_RESERVED_FIELDS = frozenset(PROMPT_FIELDS + EXPECTED_FIELDS)
+
+
+def _first_field_value(row: Dict[str, Any], fields: Tuple[str, ...]) -> Any:
+    """Stripped value of the first field in fields that is set in row, or None"""
+    for field in fields:
+        value = row.get(field)
+        if value:
+            return str(value).strip()
+    return None
+
+
 def normalize_prompt_data(raw_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, str]], List[str]]:
     """
     Normalize parsed data to standard prompt format
@@ -178,42 +256,35 @@ def normalize_prompt_data(raw_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str
     normalized_data = []
     warnings = []
     
-    # Common field mappings
-    prompt_fields = ['prompt', 'question', 'input', 'query']
-    expected_fields = ['expected_output', 'expected', 'answer', 'output', 'target', 'ground_truth']
-    
     for i, row in enumerate(raw_data):
-        # Convert all keys to lowercase for consistent matching
-        row_lower = {k.lower(): v for k, v in row.items()}
+        # Convert all keys to lowercase for consistent matching, collecting
+        # the non-empty fields other than prompt and expected output as metadata
+        row_lower = {}
+        metadata = {}
+        for key, value in row.items():
+            key = key.lower()
+            row_lower[key] = value
+            if value and key not in _RESERVED_FIELDS:
+                metadata[key] = str(value)
         
         # Find prompt field
-        prompt_value = None
-        for field in prompt_fields:
-            if field in row_lower and row_lower[field]:
-                prompt_value = str(row_lower[field]).strip()
-                break
-        
+        prompt_value = _first_field_value(row_lower, PROMPT_FIELDS)
         if not prompt_value:
             available_fields = list(row_lower.keys())
             raise FileProcessingError(
                 f"Row {i+1}: No valid prompt field found. "
                 f"Available fields: {available_fields}. "
-                f"Expected one of: {prompt_fields}"
+                f"Expected one of: {list(PROMPT_FIELDS)}"
             )
         
         # Find expected output field
-        expected_value = None
-        for field in expected_fields:
-            if field in row_lower and row_lower[field]:
-                expected_value = str(row_lower[field]).strip()
-                break
-        
+        expected_value = _first_field_value(row_lower, EXPECTED_FIELDS)
         if not expected_value:
             available_fields = list(row_lower.keys())
             raise FileProcessingError(
                 f"Row {i+1}: No valid expected output field found. "
                 f"Available fields: {available_fields}. "
-                f"Expected one of: {expected_fields}"
+                f"Expected one of: {list(EXPECTED_FIELDS)}"
             )
         
         # Create normalized entry
@@ -223,11 +294,6 @@ def normalize_prompt_data(raw_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str
         }
         
         # Add any additional metadata
-        metadata = {}
-        for key, value in row_lower.items():
-            if key not in prompt_fields + expected_fields and value:
-                metadata[key] = str(value)
-        
         if metadata:
             normalized_entry["metadata"] = metadata
         
@@ -240,12 +306,17 @@ def normalize_prompt_data(raw_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str
     return normalized_data, warnings
 
 
-def process_uploaded_file(content: bytes, filename: str) -> Tuple[List[Dict[str, str]], List[str]]:
+def process_uploaded_file(content: Iterable[bytes], filename: str) -> Tuple[List[Dict[str, str]], List[str]]:
     """
     Main function to process uploaded file content
     
+    The content is decoded and parsed as it is read rather than joined into
+    one bytes object and one string first. It is read a second time if it
+    turns out not to be valid UTF-8, so it must be re-iterable (e.g. a list
+    of chunks).
+    
     Args:
-        content: Raw file content as bytes
+        content: Raw file content as an iterable of byte chunks
         filename: Name of the uploaded file
         
     Returns:
@@ -255,29 +326,34 @@ def process_uploaded_file(content: bytes, filename: str) -> Tuple[List[Dict[str,
         HTTPException: For various file processing errors
     """
     try:
-        # Decode content to string
+        # Pick the parser based on file extension
+        if filename.lower().endswith('.csv'):
+            parse = parse_csv_content
+        elif filename.lower().endswith('.jsonl'):
+            parse = parse_jsonl_content
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail="Unsupported file format"
+            )
+        
+        # Decode and parse, falling back to Latin-1 if the content is not UTF-8.
+        # JSONL lines go to orjson as raw bytes, which it decodes as UTF-8 itself;
+        # CSV is decoded as utf-8-sig so a leading BOM is not read into the header.
         try:
-            content_str = content.decode('utf-8')
+            if parse is parse_jsonl_content:
+                raw_data = parse(open_binary_stream(content))
+            else:
+                raw_data = parse(open_text_stream(content, 'utf-8-sig'))
         except UnicodeDecodeError:
             try:
-                content_str = content.decode('latin-1')
+                raw_data = parse(open_text_stream(content, 'latin-1'))
             except UnicodeDecodeError:
                 raise HTTPException(
                     status_code=400,
                     detail="Unable to decode file. Please ensure file is in UTF-8 or Latin-1 encoding"
                 )
         
-        # Parse based on file extension
-        if filename.lower().endswith('.csv'):
-            raw_data = parse_csv_content(content_str)
-        elif filename.lower().endswith('.jsonl'):
-            raw_data = parse_jsonl_content(content_str)
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail="Unsupported file format"
-            )
-        
         # Normalize the data
         normalized_data, warnings = normalize_prompt_data(raw_data)
         
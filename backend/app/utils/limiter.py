@@ -0,0 +1,84 @@
+"""
+Per-client rate limiting for API endpoints
+Token buckets kept in process memory, applied as FastAPI dependencies
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Tuple
+import logging
+
+from fastapi import HTTPException, Request
+from slowapi.util import get_remote_address
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Token bucket rate limit per client IP, usable as a FastAPI dependency
+
+    Each client may burst up to requests_per_minute requests, and tokens refill
+    continuously at requests_per_minute / 60 per second. The limit is fixed when
+    the limiter is created, so nothing is parsed per request. Only the most
+    recently seen max_clients clients are tracked; a forgotten client starts
+    again with a full bucket.
+
+    Usage:
+        @router.post("/path", dependencies=[Depends(limiter)])
+    """
+
+    def __init__(self, requests_per_minute: int, max_clients: int = 10000):
+        self.requests_per_minute = requests_per_minute
+        self.capacity = float(requests_per_minute)
+        self.refill_rate = requests_per_minute / 60.0
+        self.max_clients = max_clients
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def consume(self, client: str) -> float:
+        """
+        Take one token from the client's bucket
+
+        Returns:
+            0 if the request is allowed, otherwise the seconds until a token is available
+        """
+        current_time = time.monotonic()
+        tokens, last_refill = self.buckets.get(client, (self.capacity, current_time))
+        tokens = min(self.capacity, tokens + (current_time - last_refill) * self.refill_rate)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / self.refill_rate
+
+        self.buckets[client] = (tokens, current_time)
+        self.buckets.move_to_end(client)
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+
+        return retry_after
+
+    async def __call__(self, request: Request):
+        client = get_remote_address(request)
+        retry_after = self.consume(client)
+        if retry_after:
+            logger.warning("Rate limit exceeded for %s on %s", client, request.url.path)
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded: {self.requests_per_minute} per 1 minute",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+
+# One limiter (and so one bucket per client) for each rate-limited route, so
+# requests to one endpoint don't use up a client's quota for another
+upload_rate_limit = RateLimiter(settings.rate_limit_per_minute)
+export_rate_limit = RateLimiter(settings.rate_limit_per_minute)
+export_evaluation_rate_limit = RateLimiter(settings.rate_limit_per_minute)
+evaluation_rate_limit = RateLimiter(settings.evaluation_rate_limit_per_minute)
+stream_evaluation_rate_limit = RateLimiter(settings.evaluation_rate_limit_per_minute)
+single_evaluation_rate_limit = RateLimiter(settings.rate_limit_per_minute)
@@ -8,8 +8,12 @@ import time
 from typing import Dict, Any, Optional, List, Tuple
 import logging
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+import hashlib
+from dataclasses import asdict, dataclass
 import httpx
+import orjson
+
+from app.models.schemas import ModelInfo as ModelInfoSchema, resolve_model
 
 # Provider-specific imports
 try:
@@ -33,8 +37,48 @@ except ImportError:
     GOOGLE_AVAILABLE = False
     logging.warning("Google Generative AI library not available")
 
+# HTTP/2 support for the shared HTTP client (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by all provider API calls. The timeout is only a
+# default: each provider's SDK client applies its configured timeout.
+HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the HTTP client shared by the provider SDK clients
+    
+    Reusing one pooled client keeps connections alive between calls, so
+    requests skip the TCP and TLS handshake (and are multiplexed over HTTP/2
+    when the h2 package is installed).
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=HTTP_LIMITS,
+            timeout=HTTP_TIMEOUT
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (called on application shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 @dataclass
 class ProviderConfig:
@@ -63,9 +107,32 @@ class BaseProvider(ABC):
     
     def __init__(self, config: ProviderConfig):
         self.config = config
-        self.client = None
+        self._client = None
+        self._http_client: Optional[httpx.AsyncClient] = None
         self._setup_client()
     
+    @property
+    def client(self):
+        """
+        The provider's SDK client
+        
+        Rebuilt when the shared HTTP client it was created with has been
+        closed (on application shutdown), so the provider keeps working in a
+        later application lifespan.
+        """
+        if self._http_client is not None and self._http_client.is_closed:
+            self._setup_client()
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
+    
+    def _shared_http_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client for the SDK client, remembering which one it is"""
+        self._http_client = get_http_client()
+        return self._http_client
+    
     @abstractmethod
     def _setup_client(self):
         """Setup the provider's client"""
@@ -99,10 +166,13 @@ class OpenAIProvider(BaseProvider):
         if not OPENAI_AVAILABLE:
             raise ImportError("OpenAI library not available")
         
-        openai.api_key = self.config.api_key
-        if self.config.base_url:
-            openai.api_base = self.config.base_url
-        self.client = openai
+        self.client = openai.AsyncOpenAI(
+            api_key=self.config.api_key,
+            base_url=self.config.base_url,
+            max_retries=self.config.max_retries,
+            timeout=self.config.timeout,
+            http_client=self._shared_http_client()
+        )
     
     async def generate(
         self, 
@@ -112,7 +182,7 @@ class OpenAIProvider(BaseProvider):
     ) -> Tuple[str, Dict[str, Any]]:
         """Generate text using OpenAI API"""
         try:
-            response = await self.client.ChatCompletion.acreate(
+            response = await self.client.chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=parameters.get("max_tokens", 1000),
@@ -127,7 +197,7 @@ class OpenAIProvider(BaseProvider):
             metadata = {
                 "model": model,
                 "provider": "openai",
-                "usage": response.usage.dict() if response.usage else {},
+                "usage": response.usage.model_dump() if response.usage else {},
                 "finish_reason": response.choices[0].finish_reason,
                 "parameters": parameters
             }
@@ -183,9 +253,12 @@ class AnthropicProvider(BaseProvider):
         if not ANTHROPIC_AVAILABLE:
             raise ImportError("Anthropic library not available")
         
-        self.client = anthropic.Anthropic(
+        self.client = anthropic.AsyncAnthropic(
             api_key=self.config.api_key,
-            base_url=self.config.base_url
+            base_url=self.config.base_url,
+            max_retries=self.config.max_retries,
+            timeout=self.config.timeout,
+            http_client=self._shared_http_client()
         )
     
     async def generate(
@@ -196,7 +269,7 @@ class AnthropicProvider(BaseProvider):
     ) -> Tuple[str, Dict[str, Any]]:
         """Generate text using Anthropic API"""
         try:
-            response = await self.client.messages.acreate(
+            response = await self.client.messages.create(
                 model=model,
                 max_tokens=parameters.get("max_tokens", 1000),
                 temperature=parameters.get("temperature", 0.7),
@@ -359,9 +432,13 @@ class GroqProvider(BaseProvider):
             raise ImportError("OpenAI library not available (required for Groq)")
         
         # Groq uses OpenAI-compatible API
-        openai.api_key = self.config.api_key
-        openai.api_base = "https://api.groq.com/openai/v1"
-        self.client = openai
+        self.client = openai.AsyncOpenAI(
+            api_key=self.config.api_key,
+            base_url=self.config.base_url or "https://api.groq.com/openai/v1",
+            max_retries=self.config.max_retries,
+            timeout=self.config.timeout,
+            http_client=self._shared_http_client()
+        )
     
     async def generate(
         self, 
@@ -371,7 +448,7 @@ class GroqProvider(BaseProvider):
     ) -> Tuple[str, Dict[str, Any]]:
         """Generate text using Groq API"""
         try:
-            response = await self.client.ChatCompletion.acreate(
+            response = await self.client.chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=parameters.get("max_tokens", 1000),
@@ -384,7 +461,7 @@ class GroqProvider(BaseProvider):
             metadata = {
                 "model": model,
                 "provider": "groq",
-                "usage": response.usage.dict() if response.usage else {},
+                "usage": response.usage.model_dump() if response.usage else {},
                 "finish_reason": response.choices[0].finish_reason,
                 "parameters": parameters
             }
@@ -440,9 +517,13 @@ class CustomProvider(BaseProvider):
         if not OPENAI_AVAILABLE:
             raise ImportError("OpenAI library not available")
         
-        openai.api_key = self.config.api_key
-        openai.api_base = self.config.base_url
-        self.client = openai
+        self.client = openai.AsyncOpenAI(
+            api_key=self.config.api_key,
+            base_url=self.config.base_url,
+            max_retries=self.config.max_retries,
+            timeout=self.config.timeout,
+            http_client=self._shared_http_client()
+        )
     
     async def generate(
         self, 
@@ -452,7 +533,7 @@ class CustomProvider(BaseProvider):
     ) -> Tuple[str, Dict[str, Any]]:
         """Generate text using custom API"""
         try:
-            response = await self.client.ChatCompletion.acreate(
+            response = await self.client.chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=parameters.get("max_tokens", 1000),
@@ -465,7 +546,7 @@ class CustomProvider(BaseProvider):
             metadata = {
                 "model": model,
                 "provider": "custom",
-                "usage": response.usage.dict() if response.usage else {},
+                "usage": response.usage.model_dump() if response.usage else {},
                 "finish_reason": response.choices[0].finish_reason,
                 "parameters": parameters
             }
@@ -501,21 +582,37 @@ class ProviderManager:
     def __init__(self):
         self.providers: Dict[str, BaseProvider] = {}
         self.model_mapping: Dict[str, str] = {}  # model_id -> provider_name
+        self._models_json: Optional[Tuple[bytes, str]] = None
     
     def add_provider(self, name: str, provider: BaseProvider):
         """Add a provider to the manager"""
         self.providers[name] = provider
+        self._models_json = None
         
         # Update model mapping
         for model_info in provider.get_available_models():
             self.model_mapping[model_info.id] = name
     
-    def get_provider_for_model(self, model: str) -> Optional[BaseProvider]:
-        """Get the provider for a specific model"""
+    def resolve(self, model: str) -> Tuple[Optional[BaseProvider], str]:
+        """
+        Resolve a model name to its provider and canonical model id
+        
+        Known models and aliases come from the static model table; anything
+        else (e.g. custom provider models) falls back to the registered mapping.
+        """
+        resolved = resolve_model(model)
+        if resolved:
+            provider_name, model_id = resolved
+            return self.providers.get(provider_name), model_id
+        
         provider_name = self.model_mapping.get(model)
         if provider_name:
-            return self.providers.get(provider_name)
-        return None
+            return self.providers.get(provider_name), model
+        return None, model
+    
+    def get_provider_for_model(self, model: str) -> Optional[BaseProvider]:
+        """Get the provider for a specific model"""
+        return self.resolve(model)[0]
     
     def get_all_models(self) -> List[ModelInfo]:
         """Get all available models from all providers"""
@@ -524,6 +621,24 @@ class ProviderManager:
             all_models.extend(provider.get_available_models())
         return all_models
     
+    def get_models_json(self) -> Tuple[bytes, str]:
+        """
+        Get all available models serialized for the API, with an ETag
+        
+        The model list only changes when a provider is added, so the JSON is
+        built once and reused until then.
+        
+        Returns:
+            Tuple of (JSON bytes, quoted ETag)
+        """
+        if self._models_json is None:
+            payload = orjson.dumps([
+                ModelInfoSchema(**asdict(model), is_available=True).model_dump()
+                for model in self.get_all_models()
+            ])
+            self._models_json = (payload, f'"{hashlib.md5(payload).hexdigest()}"')
+        return self._models_json
+    
     def validate_model(self, model: str) -> bool:
         """Validate if a model is supported by any provider"""
         return model in self.model_mapping
@@ -535,11 +650,11 @@ class ProviderManager:
         parameters: Dict[str, Any]
     ) -> Tuple[str, Dict[str, Any]]:
         """Generate text using the appropriate provider"""
-        provider = self.get_provider_for_model(model)
+        provider, model_id = self.resolve(model)
         if not provider:
             raise ValueError(f"No provider found for model: {model}")
         
-        return await provider.generate(prompt, model, parameters)
+        return await provider.generate(prompt, model_id, parameters)
 
 
 # Global provider manager instance
@@ -0,0 +1,251 @@
+"""
+Storage for evaluation results and status
+Keeps data in process memory by default, or in Redis when REDIS_URL is set
+so that every worker sees the same evaluations
+"""
+
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, MutableMapping, Optional, Tuple
+import logging
+
+import orjson
+
+from app.config import settings
+from app.models import EvaluationResult
+
+# Optional shared backend
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Optional TTL-based eviction for the in-memory store
+try:
+    from cachetools import TTLCache
+    CACHETOOLS_AVAILABLE = True
+except ImportError:
+    CACHETOOLS_AVAILABLE = False
+
+# Optional faster compression for stored results (zlib is used otherwise)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STATUS_KEY_PREFIX = "evalstat:"
+RESULTS_KEY_PREFIX = "evalres:"
+
+# Frames written by zstandard start with this magic number, zlib streams never do
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class EvaluationStore:
+    """
+    Store for evaluation results and status information
+
+    Results are stored as a single compressed JSON blob per evaluation
+    (zstd when available, otherwise zlib), both in memory and in Redis.
+
+    In memory, at most max_evaluations results (and four times as many
+    statuses) are kept, evicting the least recently used first; with
+    cachetools installed entries also expire after ttl_seconds. In Redis,
+    status is kept as a hash (one JSON-encoded value per field) so progress
+    updates only write the changed fields, and both keys expire after
+    ttl_seconds.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, ttl_seconds: int = 86400, max_evaluations: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_evaluations = max_evaluations
+        self.redis = None
+        self.results: MutableMapping[str, bytes] = bounded_map(max_evaluations, ttl_seconds)
+        self.status: MutableMapping[str, Dict[str, Any]] = bounded_map(max_evaluations * 4, ttl_seconds)
+        self._results_version = 0
+
+        if redis_url:
+            if REDIS_AVAILABLE:
+                self.redis = aioredis.from_url(redis_url)
+                logger.info("Using Redis for evaluation storage")
+            else:
+                logger.warning("REDIS_URL is set but the redis library is not available, using in-memory storage")
+
+    async def set_status(self, evaluation_id: str, status: Dict[str, Any]):
+        """Replace the status of an evaluation"""
+        if self.redis is None:
+            self.status[evaluation_id] = dict(status)
+            return
+
+        key = STATUS_KEY_PREFIX + evaluation_id
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=_encode_fields(status))
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+
+    async def update_status(self, evaluation_id: str, **fields: Any):
+        """Update individual status fields of an evaluation"""
+        if self.redis is None:
+            self.status.setdefault(evaluation_id, {}).update(fields)
+            return
+
+        key = STATUS_KEY_PREFIX + evaluation_id
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=_encode_fields(fields))
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+
+    @property
+    def results_version(self) -> Optional[Tuple[int, int]]:
+        """
+        Token that changes whenever the set of stored results changes
+
+        Lets callers cache values derived from all results. None when results
+        live in Redis, where other workers can change them.
+        """
+        if self.redis is not None:
+            return None
+        # The count catches entries dropped by TTL expiry
+        return self._results_version, len(self.results)
+
+    async def get_status(self, evaluation_id: str) -> Optional[Dict[str, Any]]:
+        """Get the status of an evaluation, or None if unknown"""
+        if self.redis is None:
+            return self.status.get(evaluation_id)
+
+        fields = await self.redis.hgetall(STATUS_KEY_PREFIX + evaluation_id)
+        if not fields:
+            return None
+        return {key.decode(): orjson.loads(value) for key, value in fields.items()}
+
+    async def set_results(self, evaluation_id: str, results: List[EvaluationResult]):
+        """Store the results of an evaluation"""
+        if self.redis is None:
+            self.results[evaluation_id] = _encode_results(results)
+            self._results_version += 1
+            logger.debug("In-memory evaluation store: %d results, %d statuses", len(self.results), len(self.status))
+            return
+
+        await self.redis.set(
+            RESULTS_KEY_PREFIX + evaluation_id,
+            _encode_results(results),
+            ex=self.ttl_seconds
+        )
+
+    async def get_results(self, evaluation_id: str) -> Optional[List[EvaluationResult]]:
+        """Get the results of an evaluation, or None if unknown"""
+        if self.redis is None:
+            blob = self.results.get(evaluation_id)
+            return _decode_results(blob) if blob is not None else None
+
+        blob = await self.redis.get(RESULTS_KEY_PREFIX + evaluation_id)
+        if blob is None:
+            return None
+        return _decode_results(blob)
+
+    async def get_all_results(self) -> Dict[str, List[EvaluationResult]]:
+        """Get the results of every stored evaluation keyed by evaluation ID"""
+        if self.redis is None:
+            return {evaluation_id: _decode_results(blob) for evaluation_id, blob in list(self.results.items())}
+
+        keys = [key async for key in self.redis.scan_iter(match=RESULTS_KEY_PREFIX + "*")]
+        if not keys:
+            return {}
+
+        blobs = await self.redis.mget(keys)
+        return {
+            key.decode()[len(RESULTS_KEY_PREFIX):]: _decode_results(blob)
+            for key, blob in zip(keys, blobs)
+            if blob is not None
+        }
+
+    async def delete(self, evaluation_id: str) -> List[str]:
+        """
+        Delete the results and status of an evaluation
+
+        Returns:
+            Names of the deleted items ("results", "status")
+        """
+        if self.redis is None:
+            deleted_items = []
+            if self.results.pop(evaluation_id, None) is not None:
+                self._results_version += 1
+                deleted_items.append("results")
+            if self.status.pop(evaluation_id, None) is not None:
+                deleted_items.append("status")
+            return deleted_items
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(RESULTS_KEY_PREFIX + evaluation_id)
+            pipe.delete(STATUS_KEY_PREFIX + evaluation_id)
+            results_deleted, status_deleted = await pipe.execute()
+
+        return [
+            name for name, deleted in (("results", results_deleted), ("status", status_deleted))
+            if deleted
+        ]
+
+
+class _LRUDict(OrderedDict):
+    """Dictionary that evicts its least recently used entries beyond maxsize"""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+def bounded_map(maxsize: int, ttl_seconds: int) -> MutableMapping:
+    """In-memory mapping bounded by size, and by age when cachetools is available"""
+    if CACHETOOLS_AVAILABLE:
+        return TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+    return _LRUDict(maxsize)
+
+
+def _encode_fields(fields: Dict[str, Any]) -> Dict[str, bytes]:
+    """Encode status fields as JSON so their types survive the Redis hash"""
+    return {key: orjson.dumps(value) for key, value in fields.items()}
+
+
+def _encode_results(results: List[EvaluationResult]) -> bytes:
+    """Serialize results to compressed JSON"""
+    data = orjson.dumps([result.model_dump() for result in results])
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data)
+
+
+def _decode_results(blob: bytes) -> List[EvaluationResult]:
+    """Deserialize results stored by _encode_results"""
+    if blob.startswith(ZSTD_MAGIC):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Stored results are zstd-compressed but zstandard is not available")
+        data = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        data = zlib.decompress(blob)
+    return [EvaluationResult.model_validate(item) for item in orjson.loads(data)]
+
+
+# Global evaluation store instance
+evaluation_store = EvaluationStore(
+    settings.redis_url,
+    settings.evaluation_ttl_seconds,
+    settings.max_stored_evaluations
+)
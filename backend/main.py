@@ -3,52 +3,45 @@ FastAPI backend for LLM Evaluation Tool
 Modular and secure API for evaluating LLM performance
 """
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from fastapi.responses import ORJSONResponse
 import logging
 import os
 from contextlib import asynccontextmanager
 
-from app.config import settings
+from app.config import Settings, get_settings, settings
 from app.routers import upload, evaluation, export
 from app.middleware.security import SecurityMiddleware
+from app.utils.providers import close_http_client
 from app.utils.logging_config import setup_logging
 
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# Rate limiter setup
-limiter = Limiter(key_func=get_remote_address)
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler"""
     logger.info("Starting LLM Evaluation Tool API")
-    logger.info(f"Environment: {settings.ENVIRONMENT}")
-    logger.info(f"Debug mode: {settings.DEBUG}")
+    logger.info(f"Environment: {settings.environment}")
+    logger.info(f"Debug mode: {settings.debug}")
     yield
     logger.info("Shutting down LLM Evaluation Tool API")
+    await close_http_client()
 
 # Create FastAPI app
 app = FastAPI(
     title="LLM Evaluation Tool API",
     description="A modular and secure FastAPI backend for evaluating LLM performance",
     version="1.0.0",
-    docs_url="/docs" if settings.DEBUG else None,
-    redoc_url="/redoc" if settings.DEBUG else None,
+    docs_url="/docs" if settings.debug else None,
+    redoc_url="/redoc" if settings.debug else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Add rate limiting
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # Security middleware
 app.add_middleware(SecurityMiddleware)
 
@@ -62,7 +55,7 @@ app.add_middleware(
 )
 
 # Trusted host middleware for production
-if settings.ENVIRONMENT == "production":
+if settings.environment == "production":
     app.add_middleware(
         TrustedHostMiddleware,
         allowed_hosts=settings.ALLOWED_HOSTS
@@ -83,15 +76,15 @@ async def root():
     }
 
 @app.get("/health")
-async def health_check():
+async def health_check(app_settings: Settings = Depends(get_settings)):
     """Health check endpoint for monitoring"""
-    return {"status": "healthy", "environment": settings.ENVIRONMENT}
+    return {"status": "healthy", "environment": app_settings.environment}
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"}
     )
@@ -102,6 +95,8 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.DEBUG,
-        log_level="info"
+        reload=settings.debug,
+        log_level="info",
+        loop="auto",  # uvloop and httptools when installed (uvicorn[standard])
+        http="auto"
     ) 
\ No newline at end of file
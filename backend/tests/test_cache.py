@@ -0,0 +1,130 @@
+"""
+Tests for the LLM response caches
+"""
+
+import asyncio
+
+from app.models import EvaluationResult, ModelParameters, PromptData
+from app.utils.cache import LLMResponseCache, ResultCache
+
+PARAMETERS = ModelParameters(temperature=0)
+
+
+def _llm_cache_with(prompt: str) -> LLMResponseCache:
+    cache = LLMResponseCache()
+    key = cache.key(prompt, "gpt-4", {"temperature": 0})
+    asyncio.run(cache.set(key, (f"response to {prompt}", {"provider": "openai"})))
+    return cache
+
+
+def test_llm_response_cache_misses_near_identical_prompts():
+    near_misses = [
+        ("Review: great product. I love it. Sentiment?", "Review: great product. I hate it. Sentiment?"),
+        ("Is 15 a prime number?", "Is 17 a prime number?"),
+        ("What is 12 + 16?", "What is 12 + 15?"),
+    ]
+    for cached_prompt, prompt in near_misses:
+        cache = _llm_cache_with(cached_prompt)
+        keys = [cache.key(p, "gpt-4", {"temperature": 0}) for p in (prompt, cached_prompt)]
+
+        assert asyncio.run(cache.get(keys[0])) is None
+        assert asyncio.run(cache.get_many(keys)) == [None, (f"response to {cached_prompt}", {"provider": "openai"})]
+
+
+def _evaluation_result(prompt_data: PromptData) -> EvaluationResult:
+    return EvaluationResult(
+        id=1,
+        prompt=prompt_data.prompt,
+        model_response="27",
+        expected_output=prompt_data.expected_output,
+        exact_match=100.0,
+        fuzzy_match=100.0,
+        toxicity=False,
+        model="gpt-4",
+        timestamp="2024-01-01T00:00:00Z"
+    )
+
+
+def test_result_cache_hits_same_evaluation_and_misses_changed_inputs():
+    cache = ResultCache()
+    prompt_data = PromptData(prompt="What is 12 + 15?", expected_output="27")
+    result = _evaluation_result(prompt_data)
+    asyncio.run(cache.set_many({cache.key(prompt_data, "gpt-4", PARAMETERS): result}))
+
+    keys = [
+        cache.key(PromptData(prompt=" what is 12 + 15? ", expected_output="27"), "gpt-4", PARAMETERS),
+        cache.key(PromptData(prompt="What is 12 + 16?", expected_output="27"), "gpt-4", PARAMETERS),
+        cache.key(PromptData(prompt="What is 12 + 15?", expected_output="28"), "gpt-4", PARAMETERS),
+        cache.key(prompt_data, "gpt-3.5-turbo", PARAMETERS),
+        cache.key(prompt_data, "gpt-4", ModelParameters(temperature=0, max_tokens=10)),
+    ]
+
+    assert asyncio.run(cache.get_many(keys)) == [result, None, None, None, None]
+
+
+def test_llm_response_cache_hits_exact_call_only():
+    cache = LLMResponseCache()
+    parameters = {"temperature": 0, "max_tokens": 100}
+    key = cache.key("What is 12 + 15?", "gpt-4", parameters)
+    asyncio.run(cache.set(key, ("27", {"provider": "openai"})))
+
+    assert asyncio.run(cache.get(cache.key("What is 12 + 15?", "gpt-4", dict(parameters)))) == (
+        "27", {"provider": "openai"}
+    )
+    assert asyncio.run(cache.get(cache.key("what is 12 + 15?", "gpt-4", parameters))) is None
+    assert asyncio.run(cache.get(cache.key("What is 12 + 15?", "gpt-4", {"temperature": 0}))) is None
+    assert asyncio.run(cache.get(cache.key("What is 12 + 15?", "claude-3", parameters))) is None
+
+
+def test_llm_response_cache_skips_unserializable_metadata():
+    cache = LLMResponseCache()
+    key = cache.key("What is 12 + 15?", "gpt-4", {})
+    asyncio.run(cache.set(key, ("27", {"raw": object()})))
+
+    assert asyncio.run(cache.get(key)) is None
+
+
+def test_batch_evaluation_scores_cached_responses_without_calling_the_model(monkeypatch):
+    from app.utils import evaluation
+
+    cache = LLMResponseCache()
+    parameters = ModelParameters(temperature=0)
+    key = cache.key("What is 12 + 15?", "gpt-4", parameters.model_dump(exclude_none=True))
+    asyncio.run(cache.set(key, ("27", {"provider": "openai"})))
+    monkeypatch.setattr(evaluation, "llm_cache", cache)
+
+    async def fail_call(*args, **kwargs):
+        raise AssertionError("model API called for a cached prompt")
+
+    monkeypatch.setattr(evaluation, "call_llm_api", fail_call)
+    prompts = [PromptData(prompt="What is 12 + 15?", expected_output="27")]
+
+    [result] = asyncio.run(evaluation.evaluate_prompts_batch(prompts, "gpt-4", parameters))
+
+    assert result.model_response == "27"
+    assert result.provider == "openai"
+    assert result.exact_match == 100.0
+
+
+def test_result_cache_hits_are_timestamped_with_the_current_evaluation(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.routers import evaluation as evaluation_router
+    from main import app
+
+    cache = ResultCache()
+    prompt_data = PromptData(prompt="What is 12 + 15?", expected_output="27")
+    asyncio.run(cache.set_many({cache.key(prompt_data, "gpt-4", PARAMETERS): _evaluation_result(prompt_data)}))
+    monkeypatch.setattr(evaluation_router, "result_cache", cache)
+
+    response = TestClient(app).post("/api/v1/evaluate", json={
+        "prompts": [prompt_data.model_dump()],
+        "model": "gpt-4",
+        "parameters": PARAMETERS.model_dump(),
+    })
+
+    assert response.status_code == 200, response.text
+    assert response.headers["X-Cache-Hits"] == "1"
+    [result] = response.json()["results"]
+    assert result["modelResponse"] == "27"
+    assert not result["timestamp"].startswith("2024-01-01")
@@ -0,0 +1,41 @@
+"""
+Tests for the streamed evaluation endpoint
+"""
+
+import asyncio
+
+from app.models import EvaluationRequest
+from app.routers import evaluation as evaluation_router
+from app.utils.storage import evaluation_store
+
+
+def test_client_disconnect_marks_the_evaluation_cancelled(monkeypatch):
+    async def never_finishes(*args, **kwargs):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(evaluation_router, "evaluate_prompts_batch", never_finishes)
+    evaluation_request = EvaluationRequest(
+        prompts=[{"prompt": "What is 12 + 15?", "expected_output": "27"}],
+        model="gpt-3.5-turbo"
+    )
+
+    async def run():
+        response = await evaluation_router.evaluate_prompts_stream(None, evaluation_request)
+        events = response.body_iterator
+        start = await events.__anext__()
+        evaluation_id = evaluation_router.orjson.loads(start.split(b"data: ", 1)[1])["evaluation_id"]
+
+        # Let the evaluation start, stop reading as a disconnecting client
+        # would, then let the evaluation task unwind
+        await asyncio.sleep(0)
+        await events.aclose()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        status = await evaluation_store.get_status(evaluation_id)
+        await evaluation_store.delete(evaluation_id)
+        return status
+
+    status = asyncio.run(run())
+
+    assert status["status"] == "cancelled"
+    assert "cancelled_at_ns" in status
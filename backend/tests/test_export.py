@@ -0,0 +1,111 @@
+"""
+Tests for the export endpoints
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import EvaluationResult
+from app.routers import export
+from app.utils.storage import evaluation_store
+from main import app
+
+EXPORT_URL = "/api/v1/export"
+
+
+@pytest.fixture
+def stored_evaluation():
+    """Store results under a test evaluation ID and remove them afterwards"""
+    evaluation_id = "test-export"
+
+    def store(count: int) -> str:
+        results = [EvaluationResult.model_validate(_result(i)) for i in range(count)]
+        asyncio.run(evaluation_store.set_results(evaluation_id, results))
+        return f"{EXPORT_URL}/{evaluation_id}"
+
+    yield store
+    asyncio.run(evaluation_store.delete(evaluation_id))
+
+
+def _result(i: int) -> dict:
+    return EvaluationResult(
+        id=i,
+        prompt=f"What is {i} + {i}?",
+        model_response=str(2 * i),
+        expected_output=str(2 * i),
+        exact_match=100.0,
+        fuzzy_match=100.0,
+        toxicity=False,
+        model="gpt-4",
+        timestamp="2024-01-01T00:00:00Z"
+    ).model_dump(mode="json")
+
+
+def _export(client: TestClient, count: int, **params):
+    body = {"format": "csv", "include_metadata": False, "results": [_result(i) for i in range(count)]}
+    return client.post(EXPORT_URL, json=body, params=params)
+
+
+def test_error_while_streaming_is_logged_and_aborts_the_response(monkeypatch):
+    build_row = export._csv_row
+    logged = []
+
+    def failing_row(result):
+        if result.id == export.STREAMING_EXPORT_THRESHOLD - 1:
+            raise ValueError("bad result")
+        return build_row(result)
+
+    monkeypatch.setattr(export, "_csv_row", failing_row)
+    monkeypatch.setattr(export.logger, "error", lambda message, *args, **kwargs: logged.append(message % args))
+    client = TestClient(app)
+
+    with pytest.raises(ValueError):
+        _export(client, export.STREAMING_EXPORT_THRESHOLD)
+
+    assert len(logged) == 1 and "failed while streaming" in logged[0]
+
+
+def test_gzip_export_round_trips():
+    chunks = [b"ID,Prompt\r\n"] + [f"{i},prompt {i}\r\n".encode() for i in range(1000)]
+
+    assert gzip.decompress(b"".join(export.iter_gzip(iter(chunks)))) == b"".join(chunks)
+
+
+@pytest.mark.parametrize("count", [10, export.STREAMING_EXPORT_THRESHOLD])
+def test_gzip_export_matches_plain_export(stored_evaluation, count):
+    url = stored_evaluation(count)
+    client = TestClient(app)
+
+    plain = client.get(url, params={"include_metadata": False})
+    compressed = client.get(url, params={"include_metadata": False, "gzip": True})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.content == plain.content  # decoded by the client
+    rows = list(csv.reader(io.StringIO(plain.text)))
+    assert len(rows) == count + 1
+
+
+def test_small_exports_have_content_length_and_large_ones_are_streamed(stored_evaluation):
+    client = TestClient(app)
+
+    small = client.get(stored_evaluation(export.STREAMING_EXPORT_THRESHOLD - 1))
+    assert int(small.headers["content-length"]) == len(small.content)
+
+    large = client.get(stored_evaluation(export.STREAMING_EXPORT_THRESHOLD))
+    assert large.status_code == 200
+    assert "content-length" not in large.headers
+
+
+def test_exports_above_the_limit_are_rejected(stored_evaluation):
+    client = TestClient(app)
+
+    assert client.get(stored_evaluation(export.MAX_RESULTS_PER_EXPORT)).status_code == 200
+
+    response = client.get(stored_evaluation(export.MAX_RESULTS_PER_EXPORT + 1))
+    assert response.status_code == 413
+    assert str(export.MAX_RESULTS_PER_EXPORT) in response.json()["detail"]
@@ -0,0 +1,57 @@
+"""
+Tests for the per-client rate limiter
+"""
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils import limiter as limiter_module
+from app.utils.limiter import RateLimiter
+
+
+def _app_with(*limiters: RateLimiter) -> FastAPI:
+    app = FastAPI()
+    for i, limiter in enumerate(limiters):
+        app.get(f"/route{i}", dependencies=[Depends(limiter)])(lambda: {"ok": True})
+    return app
+
+
+def test_exceeding_the_limit_returns_429_with_retry_after():
+    client = TestClient(_app_with(RateLimiter(2)))
+
+    assert client.get("/route0").status_code == 200
+    assert client.get("/route0").status_code == 200
+    response = client.get("/route0")
+
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Rate limit exceeded: 2 per 1 minute"}
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+
+
+def test_routes_with_separate_limiters_have_separate_quotas():
+    client = TestClient(_app_with(RateLimiter(1), RateLimiter(1)))
+
+    assert client.get("/route0").status_code == 200
+    assert client.get("/route1").status_code == 200
+    assert client.get("/route0").status_code == 429
+
+
+def test_each_rate_limited_route_has_its_own_limiter():
+    from main import app
+
+    route_limiters = {}
+    for route in app.routes:
+        for dependency in getattr(route, "dependencies", []):
+            if isinstance(dependency.dependency, RateLimiter):
+                route_limiters[route.path] = dependency.dependency
+
+    assert set(route_limiters) >= {
+        "/api/v1/upload",
+        "/api/v1/export",
+        "/api/v1/export/{evaluation_id}",
+        "/api/v1/evaluate",
+        "/api/v1/evaluate/stream",
+        "/api/v1/evaluate/single",
+    }
+    assert len({id(limiter) for limiter in route_limiters.values()}) == len(route_limiters)
+    assert limiter_module.upload_rate_limit is route_limiters["/api/v1/upload"]
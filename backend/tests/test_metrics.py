@@ -0,0 +1,61 @@
+"""
+Tests for the advanced evaluation metrics
+"""
+
+import pytest
+
+from app.utils.advanced_metrics import (
+    _tokenize,
+    batch_rouge_1,
+    batch_tfidf_similarity,
+    calculate_advanced_metrics,
+    compute_semantic_batch
+)
+
+PAIRS = [
+    ("Paris", "paris "),
+    ("The capital of France is Paris.", "The capital of France is Paris."),
+    ("The capital of France is Paris.", "Paris is the capital city of France."),
+    ("Water boils at 100 degrees Celsius.", "The boiling point of water is 100 C."),
+    ("snake_case names", "snake_case identifiers"),
+    ("", "anything"),
+    ("the a an", "of the"),
+]
+
+
+def test_batch_metrics_match_single_pair_metrics():
+    references = [reference for reference, _ in PAIRS]
+    candidates = [candidate for _, candidate in PAIRS]
+
+    similarities = compute_semantic_batch(references, candidates)
+    rouge_1_scores = batch_rouge_1(references, candidates)
+
+    for (reference, candidate), similarity, rouge_1 in zip(PAIRS, similarities, rouge_1_scores):
+        single = calculate_advanced_metrics(reference, candidate)
+        assert similarity["tfidf"] == pytest.approx(single["semantic_similarity"]["tfidf"]), (reference, candidate)
+        assert similarity["jaccard"] == single["semantic_similarity"]["jaccard"], (reference, candidate)
+        assert similarity["sequence"] == single["semantic_similarity"]["sequence"], (reference, candidate)
+        assert rouge_1 == single["rouge_scores"]["rouge-1"], (reference, candidate)
+
+
+def test_exact_match_scores_perfectly_on_every_path():
+    single = calculate_advanced_metrics("Paris", "paris ")
+    [similarity] = compute_semantic_batch(["Paris"], ["paris "])
+    [rouge_1] = batch_rouge_1(["Paris"], ["paris "])
+
+    assert single["semantic_similarity"] == similarity == {"tfidf": 1.0, "jaccard": 1.0, "sequence": 1.0}
+    assert single["rouge_scores"]["rouge-1"] == rouge_1 == {"precision": 1.0, "recall": 1.0, "f1": 1.0}
+
+
+def test_batch_tfidf_does_not_depend_on_other_pairs():
+    pair = ("The capital of France is Paris.", "Paris is the capital city of France.")
+    others = [("Water boils at 100 degrees.", "Paris in spring."), ("France", "capital of France")]
+
+    alone = batch_tfidf_similarity([pair])[0]
+    in_batch = batch_tfidf_similarity(others + [pair])[-1]
+
+    assert in_batch == pytest.approx(alone)
+
+
+def test_fast_tokenizer_keeps_underscored_identifiers_whole():
+    assert _tokenize("Call snake_case(var_1) now.") == ("call", "snake_case", "(", "var_1", ")", "now", ".")
@@ -0,0 +1,31 @@
+"""
+Tests for the provider clients and the shared HTTP client
+"""
+
+import asyncio
+
+import pytest
+
+from app.utils import providers
+from app.utils.providers import GroqProvider, OpenAIProvider, ProviderConfig, close_http_client
+
+pytestmark = pytest.mark.skipif(not providers.OPENAI_AVAILABLE, reason="openai is not installed")
+
+
+def test_provider_rebuilds_its_client_after_the_shared_http_client_is_closed():
+    provider = OpenAIProvider(ProviderConfig(name="openai", api_key="test-key"))
+    first_client = provider.client
+
+    # Application shutdown closes the shared client
+    asyncio.run(close_http_client())
+
+    second_client = provider.client
+    assert second_client is not first_client
+    assert not second_client._client.is_closed
+    assert provider.client is second_client
+
+
+def test_provider_client_uses_the_configured_timeout():
+    provider = GroqProvider(ProviderConfig(name="groq", api_key="test-key", timeout=7))
+
+    assert provider.client.timeout == 7
@@ -0,0 +1,40 @@
+"""
+Tests for the security middleware
+"""
+
+import asyncio
+
+from app.middleware.security import SecurityMiddleware
+
+
+async def _passthrough_lifespan(scope, receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def test_bucket_sweeper_runs_for_the_lifespan_of_the_app():
+    middleware = SecurityMiddleware(_passthrough_lifespan)
+    observed = {}
+
+    async def run():
+        messages = asyncio.Queue()
+        await messages.put({"type": "lifespan.startup"})
+
+        async def send(message):
+            if message["type"] == "lifespan.startup.complete":
+                observed["task"] = middleware.sweep_task
+                observed["running"] = not middleware.sweep_task.done()
+                await messages.put({"type": "lifespan.shutdown"})
+
+        await middleware({"type": "lifespan"}, messages.get, send)
+
+    asyncio.run(run())
+
+    assert observed["running"]
+    assert observed["task"].cancelled()
+    assert middleware.sweep_task is None
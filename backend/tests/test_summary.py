@@ -0,0 +1,70 @@
+"""
+Tests for evaluation summary statistics
+"""
+
+import pytest
+
+from app.models import AdvancedMetrics, EvaluationResult
+from app.routers import evaluation as evaluation_router
+from app.routers.evaluation import VECTORIZED_SUMMARY_MIN_RESULTS, generate_summary
+
+BOUNDARY_SCORES = (0.0, 12.5, 25.0, 25.5, 50.0, 50.1, 75.0, 75.1, 99.9, 100.0)
+
+
+def _result(i: int, exact_match: float, fuzzy_match: float) -> EvaluationResult:
+    return EvaluationResult(
+        id=i,
+        prompt=f"prompt {i}",
+        model_response="response",
+        expected_output="expected",
+        exact_match=exact_match,
+        fuzzy_match=fuzzy_match,
+        toxicity=i % 7 == 0,
+        model=("gpt-4", "claude-3")[i % 2],
+        timestamp="2024-01-01T00:00:00Z",
+        security_flags=["flag"] * (i % 4) or None,
+        advanced_metrics=AdvancedMetrics(
+            bleu_score=i % 10 / 10,
+            rouge_scores={"rouge-1": {"precision": 0.5, "recall": 0.5, "f1": 0.5}},
+            semantic_similarity={"tfidf": 0.25, "jaccard": 0.75}
+        ) if i % 3 else None
+    )
+
+
+def _distribution(summary):
+    return {entry.range: (entry.exact_match, entry.fuzzy_match) for entry in summary.score_distribution}
+
+
+def test_scores_on_a_range_boundary_fall_in_the_lower_range():
+    results = [_result(i, score, score) for i, score in enumerate(BOUNDARY_SCORES)]
+
+    assert _distribution(generate_summary(results)) == {
+        "0-25%": (3, 3),
+        "26-50%": (2, 2),
+        "51-75%": (2, 2),
+        "76-100%": (3, 3),
+    }
+
+
+def test_vectorized_summary_matches_scalar_summary(monkeypatch):
+    results = [
+        _result(i, BOUNDARY_SCORES[i % len(BOUNDARY_SCORES)], BOUNDARY_SCORES[i * 3 % len(BOUNDARY_SCORES)])
+        for i in range(VECTORIZED_SUMMARY_MIN_RESULTS)
+    ]
+
+    vectorized = generate_summary(results)
+    monkeypatch.setattr(evaluation_router, "VECTORIZED_SUMMARY_MIN_RESULTS", len(results) + 1)
+    scalar = generate_summary(results)
+
+    assert _distribution(vectorized) == _distribution(scalar)
+    assert vectorized.flagged_prompts == scalar.flagged_prompts
+    assert vectorized.security_score == pytest.approx(scalar.security_score)
+    assert vectorized.average_exact_match == pytest.approx(scalar.average_exact_match)
+    assert vectorized.average_fuzzy_match == pytest.approx(scalar.average_fuzzy_match)
+    assert sorted(vectorized.models_used) == sorted(scalar.models_used)
+
+    vectorized_advanced = vectorized.advanced_metrics_summary
+    scalar_advanced = scalar.advanced_metrics_summary
+    assert vectorized_advanced.average_bleu_score == pytest.approx(scalar_advanced.average_bleu_score)
+    assert vectorized_advanced.average_rouge_f1 == pytest.approx(scalar_advanced.average_rouge_f1)
+    assert vectorized_advanced.average_semantic_similarity == pytest.approx(scalar_advanced.average_semantic_similarity)
@@ -0,0 +1,56 @@
+"""
+Tests for dataset uploads
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.utils.file_processing import normalize_prompt_data
+from main import app
+
+UPLOAD_URL = "/api/v1/upload"
+
+BOM = b"\xef\xbb\xbf"
+
+EXPECTED_DATA = [
+    {"prompt": "Où est le café?", "expected_output": "À côté", "metadata": None},
+    {"prompt": "What is 2 + 2?", "expected_output": "4", "metadata": None},
+]
+
+CSV_TEXT = 'prompt,expected_output\n"Où est le café?","À côté"\nWhat is 2 + 2?,4\n'
+JSONL_TEXT = (
+    '{"prompt": "Où est le café?", "expected_output": "À côté"}\n'
+    '{"prompt": "What is 2 + 2?", "expected_output": "4"}\n'
+)
+
+
+def _upload(filename: str, content: bytes):
+    client = TestClient(app)
+    return client.post(UPLOAD_URL, files={"file": (filename, content, "application/octet-stream")})
+
+
+@pytest.mark.parametrize("filename, text", [("data.csv", CSV_TEXT), ("data.jsonl", JSONL_TEXT)])
+@pytest.mark.parametrize("encode", [
+    lambda text: text.encode("utf-8"),
+    lambda text: BOM + text.encode("utf-8"),
+    lambda text: text.encode("latin-1"),
+], ids=["utf-8", "utf-8-bom", "latin-1"])
+def test_upload_decodes_utf8_with_or_without_bom_and_latin1(filename, text, encode):
+    response = _upload(filename, encode(text))
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["total_prompts"] == 2
+    assert body["data"] == EXPECTED_DATA
+
+
+def test_non_empty_extra_fields_become_metadata():
+    normalized, _ = normalize_prompt_data([
+        {"Question": " What is 2 + 2? ", "Answer": "4", "Topic": "math", "Notes": "", "Level": 1},
+        {"prompt": "Hi", "expected_output": "Hello"},
+    ])
+
+    assert normalized == [
+        {"prompt": "What is 2 + 2?", "expected_output": "4", "metadata": {"topic": "math", "level": "1"}},
+        {"prompt": "Hi", "expected_output": "Hello"},
+    ]